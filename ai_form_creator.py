@@ -6,7 +6,7 @@ Uses Gemini AI to generate forms from user input (text or file upload)
 import os
 import sys
 from typing import Optional
-from google_form_generator import GoogleFormGenerator
+from google_form_generator import get_generator
 from gemini_form_generator import GeminiFormGenerator
 
 
@@ -24,7 +24,7 @@ class AIFormCreator:
         # Initialize GoogleFormGenerator - it may not be authenticated yet (especially on headless servers)
         # Authentication will happen when create_form() is called
         # _authenticate_lazy() won't fail if there's no token, so this should always succeed
-        self.form_generator = GoogleFormGenerator()
+        self.form_generator = get_generator()
     
     def create_form_from_text(self, text: str) -> str:
         """
@@ -206,7 +206,7 @@ class AIFormCreator:
         print(f"❓ Number of questions: {len(questions)}")
         
         # Create form
-        form = self.form_generator.create_form(title, description)
+        form = self.form_generator.create_form(title, description, public=True)
         
         # Add questions
         print("\n➕ Adding questions...")
@@ -248,8 +248,8 @@ class AIFormCreator:
                 print(f"  ⚠️  Warning: Could not add question {i}: {e}")
                 continue
         
-        # Get form URL
-        form_url = form.get_url()
+        # Send the queued questions and get the form URL
+        form_url = self.form_generator.save_form(form)
         edit_url = form.get_edit_url()
         
         print("\n" + "="*70)
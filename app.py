@@ -5,15 +5,27 @@ Cross-platform web UI for non-technical users
 
 import os
 import sys
-from flask import Flask, render_template, request, jsonify, send_from_directory, session, redirect, url_for, Response, stream_with_context
+from flask import Flask, g, render_template, request, jsonify, send_from_directory, session, redirect, url_for, Response, stream_with_context
 import json
 import threading
 import queue
 from werkzeug.utils import secure_filename
 import traceback
 import io
+import time
+import functools
+import secrets
+import logging
+import logging.handlers
+import atexit
 from contextlib import redirect_stdout
 from datetime import datetime
+from google.auth import jwt as google_jwt
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import Flow
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build, build_from_document
 from ai_form_creator import AIFormCreator
 from google_form_generator import GoogleFormGenerator
 
@@ -25,7 +37,40 @@ except ImportError:
     # python-dotenv not installed, skip loading .env file
     pass
 
+# Use orjson for JSON responses if available (faster encoder). Output differs from Flask's
+# encoder in two ways: non-ASCII text is sent as UTF-8 rather than \uXXXX escapes (orjson
+# ignores ensure_ascii) - equivalent JSON to any client - and NaN/Infinity become null
+# instead of the non-standard NaN/Infinity literals. Dates (which orjson would write as
+# ISO 8601, Flask as an HTTP date), non-str dict keys and other types orjson rejects go
+# through Flask's encoder, so their output is unchanged.
+try:
+    import orjson
+    from flask.json.provider import DefaultJSONProvider
+    
+    class OrjsonProvider(DefaultJSONProvider):
+        """Flask JSON provider that encodes compact responses with orjson."""
+        
+        # The dumps() arguments of a compact response - the only format orjson writes
+        COMPACT_KWARGS = {'separators': (',', ':')}
+        
+        def dumps(self, obj, **kwargs):
+            # Pretty-printed (debug) output, other encoder options and types orjson
+            # can't encode the way Flask does fall back to the stdlib encoder
+            if kwargs == self.COMPACT_KWARGS:
+                try:
+                    return orjson.dumps(
+                        obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                    ).decode('utf-8')
+                except TypeError:
+                    pass
+            return super().dumps(obj, **kwargs)
+except ImportError:
+    # orjson not installed, keep Flask's default JSON provider
+    OrjsonProvider = None
+
 app = Flask(__name__)
+if OrjsonProvider is not None:
+    app.json = OrjsonProvider(app)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', os.urandom(32).hex())
@@ -34,16 +79,49 @@ app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', os.urandom(32).hex())
 # IMPORTANT: This should NEVER be set in production!
 FLASK_ENV = os.getenv('FLASK_ENV', 'development')
 DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
+# Environment doesn't change at runtime - resolve these once instead of per request
+IS_PRODUCTION = FLASK_ENV == 'production'
+ON_RENDER = os.getenv('RENDER') == 'true'
 if FLASK_ENV == 'development' or DEBUG:
     os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
     print("⚠️  Development mode: OAuth insecure transport enabled (HTTP allowed)")
     print("   ⚠️  WARNING: This should NEVER be enabled in production!")
 
+# Request-path diagnostics go through a queue so handlers never block on stdout writes
+# (LOG_LEVEL=warning silences the verbose OAuth diagnostics)
+logger = logging.getLogger('form_creator.app')
+logger.setLevel(logging.DEBUG if DEBUG else getattr(logging, os.getenv('LOG_LEVEL', 'info').upper(), logging.INFO))
+logger.propagate = False
+log_record_queue = queue.Queue(-1)
+logger.addHandler(logging.handlers.QueueHandler(log_record_queue))
+log_listener = logging.handlers.QueueListener(log_record_queue, logging.StreamHandler(sys.stdout))
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# Templates don't change after deploy - skip per-render mtime checks and share compiled bytecode across workers
+if IS_PRODUCTION:
+    import jinja2
+    import tempfile
+    app.config['TEMPLATES_AUTO_RELOAD'] = False
+    app.jinja_env.auto_reload = False
+    jinja_cache_dir = os.path.join(tempfile.gettempdir(), 'jinja_cache')
+    try:
+        os.makedirs(jinja_cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = jinja2.FileSystemBytecodeCache(directory=jinja_cache_dir)
+    except OSError as e:
+        print(f"⚠️  Could not enable template bytecode cache at {jinja_cache_dir}: {e}")
+
+# Rendered landing page for anonymous visitors (production only), refreshed every 60 seconds
+ANONYMOUS_INDEX_TTL = 60
+# (html, rendered_at) - replaced in a single assignment so request threads never
+# see the page from one render with the timestamp of another
+anonymous_index_cache = (None, 0.0)
+
 # Security headers
 @app.after_request
 def set_security_headers(response):
     """Set security headers for production."""
-    if os.getenv('FLASK_ENV') == 'production':
+    if IS_PRODUCTION:
         response.headers['X-Content-Type-Options'] = 'nosniff'
         response.headers['X-Frame-Options'] = 'DENY'
         response.headers['X-XSS-Protection'] = '1; mode=block'
@@ -71,9 +149,21 @@ if GEMINI_API_KEY:
 else:
     print("⚠️  GEMINI_API_KEY not found in environment variables")
 
+# OAuth scopes requested at login, bound once as an immutable tuple
+OAUTH_SCOPES = tuple(GoogleFormGenerator.SCOPES)
+
+# Shared transport for token refreshes - keeps the connection to Google's token endpoint alive
+GOOGLE_AUTH_REQUEST = Request()
+
 # Initialize AI Form Creator
 ai_creator = None
 
+# Pre-encoded /api/health bodies, keyed by whether the AI creator is initialized
+HEALTH_RESPONSE_BODIES = {
+    True: b'{"status":"ok","ai_initialized":true}',
+    False: b'{"status":"ok","ai_initialized":false}',
+}
+
 # Global log queue for real-time streaming
 log_queues = {}
 
@@ -199,6 +289,65 @@ def init_ai_creator():
             return False
     return True
 
+@functools.lru_cache(maxsize=1)
+def get_oauth2_discovery_doc():
+    """Load and parse the bundled oauth2 v2 discovery document once per process."""
+    doc = discovery_cache.get_static_doc('oauth2', 'v2')
+    return json.loads(doc) if doc else None
+
+def build_userinfo_service(credentials):
+    """Build the oauth2 v2 service, reusing the cached discovery document when available."""
+    discovery_doc = get_oauth2_discovery_doc()
+    if discovery_doc is None:
+        return build('oauth2', 'v2', credentials=credentials)
+    return build_from_document(discovery_doc, credentials=credentials)
+
+def get_id_token_email(credentials):
+    """
+    Read the email claim from the credentials' ID token, or return None.
+    The token comes straight from Google's token endpoint over TLS, so the signature isn't re-verified here.
+    """
+    id_token = getattr(credentials, 'id_token', None)
+    if not id_token:
+        return None
+    try:
+        return google_jwt.decode(id_token, verify=False).get('email')
+    except Exception:
+        return None
+
+def is_production_request(scheme, host):
+    """Detect if we're on Render or production (RENDER/FLASK_ENV, HTTPS, or a known hosting domain)."""
+    return (
+        ON_RENDER or
+        IS_PRODUCTION or
+        scheme == 'https' or
+        'onrender.com' in host or
+        'railway.app' in host
+    )
+
+@functools.lru_cache(maxsize=32)
+def get_oauth_redirect_uri(scheme, host):
+    """
+    Build the OAuth callback URL once per (scheme, host) instead of on every OAuth request.
+    Must be called inside a request context; the size bound keeps spoofed Host headers from growing the cache.
+    """
+    redirect_uri = url_for('callback', _external=True)
+    
+    # In production, force HTTPS
+    if is_production_request(scheme, host) and redirect_uri.startswith('http://'):
+        redirect_uri = 'https://' + redirect_uri[len('http://'):]
+    return redirect_uri
+
+@functools.lru_cache(maxsize=8)
+def _parse_client_config(path, mtime_ns):
+    """Parse an OAuth client secrets file (cached per path and modification time)."""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def load_client_config(path):
+    """Load OAuth client config, re-reading the file only when it changes on disk."""
+    return _parse_client_config(path, os.stat(path).st_mtime_ns)
+
 def allowed_file(filename):
     """Check if file extension is allowed."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -207,7 +356,15 @@ def allowed_file(filename):
 def index():
     """Main page."""
     # Check if user is authenticated
+    global anonymous_index_cache
     user_creds = session.get('user_credentials')
+    if user_creds is None and IS_PRODUCTION:
+        now = time.monotonic()
+        html, rendered_at = anonymous_index_cache
+        if html is None or now - rendered_at > ANONYMOUS_INDEX_TTL:
+            html = render_template('index.html', user_logged_in=False, user_email=None)
+            anonymous_index_cache = (html, now)
+        return html
     user_email = user_creds.get('user_email', None) if user_creds else None
     return render_template('index.html', user_logged_in=user_creds is not None, user_email=user_email)
 
@@ -530,7 +687,7 @@ def create_form_with_questions():
                 form_generator = ai_creator.form_generator
             
             # Create form
-            form = form_generator.create_form(title, description)
+            form = form_generator.create_form(title, description, public=True)
             
             # Add sections with descriptions if using new format
             if sections:
@@ -549,10 +706,8 @@ def create_form_with_questions():
                             pass
                     elif section_idx == 0 and section_desc:
                         # Update main form description with first section description
-                        try:
-                            form_generator.update_form_info(form.form_id, title, section_desc)
-                        except:
-                            pass
+                        # (replaces the description queued by create_form, sent on save)
+                        form.update_info(title, section_desc)
             
             # Add questions with updated required settings
             log_capture.write("\n➕ Adding questions...\n")
@@ -594,7 +749,7 @@ def create_form_with_questions():
                     log_capture.write(f"  ⚠️  Warning: Could not add question {i}: {e}\n")
                     continue
             
-            form_url = form.get_url()
+            form_url = form_generator.save_form(form)
             log_capture.write("\n✅ Form created successfully!\n")
             log_capture.write(f"🔗 Form URL: {form_url}\n")
         
@@ -809,7 +964,7 @@ def create_from_script():
                 form_generator = ai_creator.form_generator
             
             # Create form
-            form = form_generator.create_form(title, description)
+            form = form_generator.create_form(title, description, public=True)
             log_capture.write("\n➕ Adding questions...\n")
             
             for i, question in enumerate(questions, 1):
@@ -858,7 +1013,7 @@ def create_from_script():
                     log_capture.write(f"  ⚠️  Warning: Could not add question {i}: {e}\n")
                     continue
             
-            form_url = form.get_url()
+            form_url = form_generator.save_form(form)
             log_capture.write("\n✅ Form created successfully!\n")
             log_capture.write(f"🔗 Form URL: {form_url}\n")
         
@@ -883,10 +1038,8 @@ def create_from_script():
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    return jsonify({
-        'status': 'ok',
-        'ai_initialized': ai_creator is not None
-    })
+    # Hit by load balancers every few seconds - serve pre-encoded bodies instead of jsonify
+    return app.response_class(HEALTH_RESPONSE_BODIES[ai_creator is not None], mimetype='application/json')
 
 @app.route('/api/check-credentials', methods=['GET'])
 def check_credentials():
@@ -975,47 +1128,46 @@ def auth_status():
 def login():
     """Initiate OAuth flow for user."""
     try:
-        from google_auth_oauthlib.flow import Flow
-        from google_form_generator import GoogleFormGenerator
-        
-        print(f"🔍 [LOGIN] Starting OAuth login flow...")
-        print(f"   Current working directory: {os.getcwd()}")
+        logger.info("🔍 [LOGIN] Starting OAuth login flow...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("   Current working directory: %s", os.getcwd())
         
         # First, try to find or create credentials file
         # Check environment variable first
         credentials_file = os.getenv('CREDENTIALS_FILE_PATH')
-        print(f"   CREDENTIALS_FILE_PATH env var: {credentials_file}")
+        logger.info("   CREDENTIALS_FILE_PATH env var: %s", credentials_file)
         
         # Primary location: /etc/secrets/credentials.json (works on both local and Render)
         primary_location = '/etc/secrets/credentials.json'
-        print(f"   Primary location: {primary_location}")
-        print(f"   Primary location exists: {os.path.exists(primary_location)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("   Primary location: %s (exists: %s)", primary_location, os.path.exists(primary_location))
         
         # Ensure /etc/secrets/ directory exists (create if needed)
         secrets_dir = '/etc/secrets'
         if not os.path.exists(secrets_dir):
             try:
                 os.makedirs(secrets_dir, mode=0o755, exist_ok=True)
-                print(f"✅ Created directory: {secrets_dir}")
+                logger.info("✅ Created directory: %s", secrets_dir)
             except (OSError, PermissionError) as e:
                 # If we can't create /etc/secrets (e.g., no admin on Windows), fall back
-                print(f"⚠️  Could not create {secrets_dir}: {e}")
-                print(f"   Will use alternative location")
+                logger.warning("⚠️  Could not create %s: %s", secrets_dir, e)
+                logger.info("   Will use alternative location")
         
         # If not set via env var, check primary location first
         if not credentials_file or not os.path.exists(credentials_file):
-            print(f"   Checking primary location: {primary_location}")
+            logger.info("   Checking primary location: %s", primary_location)
             if os.path.exists(primary_location):
                 credentials_file = primary_location
-                print(f"✅ [LOGIN] Found credentials at primary location: {credentials_file}")
+                logger.info("✅ [LOGIN] Found credentials at primary location: %s", credentials_file)
             else:
-                print(f"   Primary location not found, checking fallback locations...")
+                logger.info("   Primary location not found, checking fallback locations...")
                 # Get absolute path for project root
                 project_root = os.path.dirname(os.path.abspath(__file__))
                 project_root_creds = os.path.join(project_root, 'credentials.json')
-                print(f"   Project root: {project_root}")
-                print(f"   Project root credentials: {project_root_creds}")
-                print(f"   Project root credentials exists: {os.path.exists(project_root_creds)}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("   Project root: %s", project_root)
+                    logger.debug("   Project root credentials: %s (exists: %s)",
+                                 project_root_creds, os.path.exists(project_root_creds))
                 
                 # Fallback locations (check absolute paths first)
                 fallback_locations = [
@@ -1028,7 +1180,7 @@ def login():
                     abs_location = os.path.abspath(location) if not os.path.isabs(location) else location
                     if os.path.exists(location) or os.path.exists(abs_location):
                         credentials_file = abs_location if os.path.exists(abs_location) else location
-                        print(f"✅ [LOGIN] Found credentials at fallback location: {credentials_file}")
+                        logger.info("✅ [LOGIN] Found credentials at fallback location: %s", credentials_file)
                         break
                 
                 # If still not found, use primary location (will create from env vars)
@@ -1036,21 +1188,23 @@ def login():
                     credentials_file = primary_location
         
         # If still not found, try to create from environment variables
-        print(f"   Final credentials_file value: {credentials_file}")
-        print(f"   credentials_file exists: {os.path.exists(credentials_file) if credentials_file else 'N/A'}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("   Final credentials_file value: %s (exists: %s)", credentials_file,
+                         os.path.exists(credentials_file) if credentials_file else 'N/A')
         
         if not credentials_file or not os.path.exists(credentials_file):
-            print(f"⚠️  [LOGIN] Credentials file not found, attempting to create from environment variables...")
+            logger.warning("⚠️  [LOGIN] Credentials file not found, attempting to create from environment variables...")
             client_id = os.getenv('GOOGLE_CLIENT_ID', '').strip()
             client_secret = os.getenv('GOOGLE_CLIENT_SECRET', '').strip()
             project_id = os.getenv('GOOGLE_PROJECT_ID', '').strip()
             
             # Debug logging
-            print(f"🔍 Checking environment variables for OAuth credentials...")
-            print(f"   GOOGLE_CLIENT_ID: {'Set (length: ' + str(len(client_id)) + ')' if client_id else 'Not set'}")
-            print(f"   GOOGLE_CLIENT_SECRET: {'Set (length: ' + str(len(client_secret)) + ')' if client_secret else 'Not set'}")
-            print(f"   GOOGLE_PROJECT_ID: {'Set (value: ' + project_id + ')' if project_id else 'Not set'}")
-            print(f"   Target credentials file: {credentials_file}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🔍 Checking environment variables for OAuth credentials...")
+                logger.debug("   GOOGLE_CLIENT_ID: %s", f"Set (length: {len(client_id)})" if client_id else 'Not set')
+                logger.debug("   GOOGLE_CLIENT_SECRET: %s", f"Set (length: {len(client_secret)})" if client_secret else 'Not set')
+                logger.debug("   GOOGLE_PROJECT_ID: %s", f"Set (value: {project_id})" if project_id else 'Not set')
+            logger.info("   Target credentials file: %s", credentials_file)
             
             if client_id and client_secret and project_id:
                 try:
@@ -1058,20 +1212,20 @@ def login():
                     if not credentials_file or credentials_file == 'credentials.json':
                         credentials_file = primary_location
                     
-                    print(f"📝 Attempting to create credentials file at: {credentials_file}")
+                    logger.info("📝 Attempting to create credentials file at: %s", credentials_file)
                     
                     # Ensure /etc/secrets/ directory exists
                     creds_dir = os.path.dirname(credentials_file)
-                    print(f"📁 Credentials directory: {creds_dir}")
+                    logger.info("📁 Credentials directory: %s", creds_dir)
                     
                     if not os.path.exists(creds_dir):
                         try:
                             os.makedirs(creds_dir, mode=0o755, exist_ok=True)
-                            print(f"✅ Created directory: {creds_dir}")
+                            logger.info("✅ Created directory: %s", creds_dir)
                         except (OSError, PermissionError) as e:
-                            print(f"⚠️  Could not create {creds_dir}: {e}")
+                            logger.warning("⚠️  Could not create %s: %s", creds_dir, e)
                             # Fallback to project root if /etc/secrets can't be created
-                            print(f"⚠️  Falling back to project root")
+                            logger.warning("⚠️  Falling back to project root")
                             credentials_file = 'credentials.json'
                             creds_dir = '.'
                     
@@ -1098,9 +1252,11 @@ def login():
                         "project_id": project_id
                     }
                     
-                    print(f"💾 Writing credentials file to: {credentials_file}")
-                    print(f"   Directory exists: {os.path.exists(creds_dir)}")
-                    print(f"   Directory writable: {os.access(creds_dir, os.W_OK) if os.path.exists(creds_dir) else 'N/A'}")
+                    logger.info("💾 Writing credentials file to: %s", credentials_file)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        dir_exists = os.path.exists(creds_dir)
+                        logger.debug("   Directory exists: %s", dir_exists)
+                        logger.debug("   Directory writable: %s", os.access(creds_dir, os.W_OK) if dir_exists else 'N/A')
                     
                     # Ensure directory exists (double check)
                     os.makedirs(creds_dir, mode=0o755, exist_ok=True)
@@ -1111,14 +1267,12 @@ def login():
                     # Verify file was created
                     if os.path.exists(credentials_file):
                         file_size = os.path.getsize(credentials_file)
-                        print(f"✅ Created credentials.json from environment variables at: {credentials_file} (size: {file_size} bytes)")
+                        logger.info("✅ Created credentials.json from environment variables at: %s (size: %s bytes)", credentials_file, file_size)
                         # File created successfully, continue with OAuth flow
                     else:
                         raise Exception(f"File was written but not found at: {credentials_file}")
                 except Exception as e:
-                    print(f"⚠️  Could not create credentials.json from environment: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.warning("⚠️  Could not create credentials.json from environment: %s", e, exc_info=True)
                     return jsonify({
                         'success': False,
                         'error': f'Could not create credentials file: {str(e)}. Please ensure GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET, and GOOGLE_PROJECT_ID are set correctly. Error details: {str(e)}'
@@ -1155,18 +1309,20 @@ def login():
             # Try to find it again in case it was created elsewhere
             if os.path.exists(primary_location):
                 credentials_file = primary_location
-                print(f"✅ Found credentials file at primary location: {credentials_file}")
+                logger.info("✅ Found credentials file at primary location: %s", credentials_file)
             elif os.path.exists('credentials.json'):
                 credentials_file = 'credentials.json'
-                print(f"✅ Found credentials file at fallback location: {credentials_file}")
+                logger.info("✅ Found credentials file at fallback location: %s", credentials_file)
             else:
                 # Additional debug info
-                print(f"❌ Credentials file not found at: {credentials_file}")
-                print(f"   Current working directory: {os.getcwd()}")
-                print(f"   Checking if /etc/secrets/ exists: {os.path.exists('/etc/secrets')}")
-                if os.path.exists('/etc/secrets'):
-                    print(f"   Files in /etc/secrets/: {os.listdir('/etc/secrets') if os.path.exists('/etc/secrets') else 'N/A'}")
-                print(f"   Files in current directory: {os.listdir('.') if os.path.exists('.') else 'N/A'}")
+                logger.error("❌ Credentials file not found at: %s", credentials_file)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("   Current working directory: %s", os.getcwd())
+                    secrets_exists = os.path.exists('/etc/secrets')
+                    logger.debug("   Checking if /etc/secrets/ exists: %s", secrets_exists)
+                    if secrets_exists:
+                        logger.debug("   Files in /etc/secrets/: %s", os.listdir('/etc/secrets'))
+                    logger.debug("   Files in current directory: %s", os.listdir('.'))
                 
                 return jsonify({
                     'success': False,
@@ -1175,61 +1331,47 @@ def login():
         
         # Verify file is readable and valid JSON
         try:
-            with open(credentials_file, 'r') as f:
-                import json
-                creds_data = json.load(f)
-                if 'installed' not in creds_data and 'web' not in creds_data:
-                    raise ValueError("Invalid credentials file format")
+            creds_data = load_client_config(credentials_file)
+            if 'installed' not in creds_data and 'web' not in creds_data:
+                raise ValueError("Invalid credentials file format")
             
             # Check OAuth client type
             oauth_type = 'web' if 'web' in creds_data else 'installed'
             client_id = creds_data.get(oauth_type, {}).get('client_id', 'Not found')
-            print(f"✅ Verified credentials file is valid at: {credentials_file}")
-            print(f"   OAuth client type: {oauth_type}")
-            print(f"   Client ID: {client_id[:50]}..." if len(str(client_id)) > 50 else f"   Client ID: {client_id}")
+            logger.info("✅ Verified credentials file is valid at: %s", credentials_file)
+            logger.info("   OAuth client type: %s", oauth_type)
+            logger.info("   Client ID: %.50s%s", client_id, '...' if len(str(client_id)) > 50 else '')
             
             # Warn if using 'installed' type (should be 'web' for web apps)
             if oauth_type == 'installed':
-                print(f"⚠️  WARNING: Using 'installed' type. For web applications, 'web' type is recommended.")
-                print(f"   Consider creating a new 'Web application' OAuth client in Google Cloud Console.")
+                logger.warning("⚠️  WARNING: Using 'installed' type. For web applications, 'web' type is recommended.")
+                logger.info("   Consider creating a new 'Web application' OAuth client in Google Cloud Console.")
         except Exception as e:
-            print(f"⚠️  Credentials file exists but is invalid: {e}")
+            logger.warning("⚠️  Credentials file exists but is invalid: %s", e)
             return jsonify({
                 'success': False,
                 'error': f'Credentials file is invalid: {str(e)}. Please check the file format.'
             }), 500
         
-        # Get redirect URI - use _external=True to get full URL
-        redirect_uri = url_for('callback', _external=True)
+        # Get redirect URI (HTTPS forced in production, cached per host)
+        is_production = is_production_request(request.scheme, request.host)
+        redirect_uri = get_oauth_redirect_uri(request.scheme, request.host)
         
-        # Detect if we're on Render or production (check for RENDER environment or HTTPS)
-        is_production = (
-            os.getenv('RENDER') == 'true' or
-            os.getenv('FLASK_ENV') == 'production' or
-            request.scheme == 'https' or
-            'onrender.com' in request.host or
-            'railway.app' in request.host
-        )
-        
-        # In production, force HTTPS
-        if is_production and redirect_uri.startswith('http://'):
-            redirect_uri = redirect_uri.replace('http://', 'https://')
-        
-        print(f"🔗 [LOGIN] Redirect URI: {redirect_uri}")
-        print(f"   Is production: {is_production}")
-        print(f"   Request scheme: {request.scheme}")
-        print(f"   Request host: {request.host}")
-        print(f"   Full request URL: {request.url}")
-        print(f"   Expected redirect URIs in Google Cloud Console:")
-        print(f"     - http://localhost:5000/auth/callback")
-        print(f"     - https://google-from-generator.onrender.com/auth/callback")
-        print(f"   Make sure the redirect URI above matches EXACTLY one of these!")
+        logger.info("🔗 [LOGIN] Redirect URI: %s", redirect_uri)
+        logger.info("   Is production: %s", is_production)
+        logger.info("   Request scheme: %s", request.scheme)
+        logger.info("   Request host: %s", request.host)
+        logger.info("   Full request URL: %s", request.url)
+        logger.info("   Expected redirect URIs in Google Cloud Console:")
+        logger.info("     - http://localhost:5000/auth/callback")
+        logger.info("     - https://google-from-generator.onrender.com/auth/callback")
+        logger.info("   Make sure the redirect URI above matches EXACTLY one of these!")
         
         # Create OAuth flow
         try:
-            flow = Flow.from_client_secrets_file(
-                credentials_file,
-                scopes=GoogleFormGenerator.SCOPES,
+            flow = Flow.from_client_config(
+                load_client_config(credentials_file),
+                scopes=OAUTH_SCOPES,
                 redirect_uri=redirect_uri
             )
             
@@ -1238,12 +1380,12 @@ def login():
                 include_granted_scopes='true',
                 prompt='consent'  # Force consent to get refresh token
             )
-            print(f"✅ OAuth flow created successfully")
-            print(f"   Authorization URL generated")
+            logger.info("✅ OAuth flow created successfully")
+            logger.info("   Authorization URL generated")
         except Exception as flow_error:
-            print(f"❌ Error creating OAuth flow: {flow_error}")
-            print(f"   This might indicate a redirect_uri_mismatch")
-            print(f"   Redirect URI used: {redirect_uri}")
+            logger.error("❌ Error creating OAuth flow: %s", flow_error)
+            logger.info("   This might indicate a redirect_uri_mismatch")
+            logger.info("   Redirect URI used: %s", redirect_uri)
             raise
         
         session['oauth_state'] = state
@@ -1251,8 +1393,7 @@ def login():
         
         return redirect(authorization_url)
     except Exception as e:
-        print(f"Error initiating OAuth: {e}")
-        print(traceback.format_exc())
+        logger.error("Error initiating OAuth: %s", e, exc_info=DEBUG)
         return jsonify({
             'success': False,
             'error': f'Failed to initiate OAuth: {str(e)}'
@@ -1262,13 +1403,9 @@ def login():
 def callback():
     """Handle OAuth callback."""
     try:
-        from google_auth_oauthlib.flow import Flow
-        from google_form_generator import GoogleFormGenerator
-        from google.oauth2.credentials import Credentials
-        
-        # Check state
+        # Check state first (constant-time) so invalid callbacks are rejected before any flow setup
         state = session.get('oauth_state')
-        if not state or state != request.args.get('state'):
+        if not state or not secrets.compare_digest(state.encode(), request.args.get('state', '').encode()):
             return jsonify({
                 'success': False,
                 'error': 'Invalid OAuth state. Please try again.'
@@ -1276,46 +1413,33 @@ def callback():
         
         credentials_file = session.get('oauth_flow_credentials_file', 'credentials.json')
         
-        # Get redirect URI - use _external=True to get full URL
-        redirect_uri = url_for('callback', _external=True)
+        # Get redirect URI (HTTPS forced in production, cached per host)
+        redirect_uri = get_oauth_redirect_uri(request.scheme, request.host)
         
-        # Detect if we're on Render or production
-        is_production = (
-            os.getenv('RENDER') == 'true' or
-            os.getenv('FLASK_ENV') == 'production' or
-            request.scheme == 'https' or
-            'onrender.com' in request.host or
-            'railway.app' in request.host
-        )
-        
-        # In production, force HTTPS
-        if is_production and redirect_uri.startswith('http://'):
-            redirect_uri = redirect_uri.replace('http://', 'https://')
-        
-        print(f"🔗 [CALLBACK] Redirect URI: {redirect_uri}")
-        print(f"   Callback URL received: {request.url}")
-        print(f"   Make sure redirect URI matches what was used in /auth/login")
+        logger.info("🔗 [CALLBACK] Redirect URI: %s", redirect_uri)
+        logger.info("   Callback URL received: %s", request.url)
+        logger.info("   Make sure redirect URI matches what was used in /auth/login")
         
         # Create flow and fetch token
         try:
-            flow = Flow.from_client_secrets_file(
-                credentials_file,
-                scopes=GoogleFormGenerator.SCOPES,
+            flow = Flow.from_client_config(
+                load_client_config(credentials_file),
+                scopes=OAUTH_SCOPES,
                 redirect_uri=redirect_uri
             )
             
-            print(f"✅ OAuth flow created for callback")
+            logger.info("✅ OAuth flow created for callback")
             
             # Fetch token - handle scope changes gracefully
             try:
                 flow.fetch_token(authorization_response=request.url)
-                print(f"✅ Token fetched successfully")
+                logger.info("✅ Token fetched successfully")
             except ValueError as scope_error:
                 # Check if it's a scope change error (Google adds scopes automatically)
                 error_str = str(scope_error)
                 if 'Scope has changed' in error_str:
-                    print(f"⚠️  Scope change detected (this is normal - Google adds userinfo scopes automatically)")
-                    print(f"   Attempting to handle gracefully...")
+                    logger.warning("⚠️  Scope change detected (this is normal - Google adds userinfo scopes automatically)")
+                    logger.info("   Attempting to handle gracefully...")
                     
                     # Try to extract the actual scopes from the error or authorization response
                     # Recreate flow with the actual scopes that were granted
@@ -1330,7 +1454,7 @@ def callback():
                         # Get the actual granted scopes from the authorization response
                         # Google includes them in the callback
                         flow.fetch_token(authorization_response=request.url, allow_scope_change=True)
-                        print(f"✅ Token fetched successfully (with scope change)")
+                        logger.info("✅ Token fetched successfully (with scope change)")
                     except AttributeError:
                         # If allow_scope_change doesn't exist, we need to handle it differently
                         # Parse the error to get the new scopes and recreate flow
@@ -1338,38 +1462,40 @@ def callback():
                         scope_match = re.search(r'to "([^"]+)"', error_str)
                         if scope_match:
                             new_scopes = scope_match.group(1).split()
-                            print(f"   Detected new scopes: {new_scopes}")
+                            logger.info("   Detected new scopes: %s", new_scopes)
                             # Recreate flow with new scopes
-                            flow = Flow.from_client_secrets_file(
-                                credentials_file,
+                            flow = Flow.from_client_config(
+                                load_client_config(credentials_file),
                                 scopes=new_scopes,
                                 redirect_uri=redirect_uri
                             )
                             flow.fetch_token(authorization_response=request.url)
-                            print(f"✅ Token fetched successfully (with updated scopes)")
+                            logger.info("✅ Token fetched successfully (with updated scopes)")
                         else:
                             raise
                 else:
                     raise
         except Exception as token_error:
-            print(f"❌ Error fetching token: {token_error}")
-            print(f"   Redirect URI used: {redirect_uri}")
-            print(f"   Callback URL: {request.url}")
+            logger.error("❌ Error fetching token: %s", token_error)
+            logger.info("   Redirect URI used: %s", redirect_uri)
+            logger.info("   Callback URL: %s", request.url)
             if 'redirect_uri_mismatch' in str(token_error).lower():
-                print(f"   ⚠️  REDIRECT URI MISMATCH DETECTED!")
-                print(f"   Please verify the redirect URI in Google Cloud Console matches exactly:")
-                print(f"   {redirect_uri}")
+                logger.warning("   ⚠️  REDIRECT URI MISMATCH DETECTED!")
+                logger.info("   Please verify the redirect URI in Google Cloud Console matches exactly:")
+                logger.info("   %s", redirect_uri)
             raise
         credentials = flow.credentials
         
-        # Get user info
-        try:
-            from googleapiclient.discovery import build
-            user_info_service = build('oauth2', 'v2', credentials=credentials)
-            user_info = user_info_service.userinfo().get().execute()
-            user_email = user_info.get('email', 'Unknown')
-        except:
-            user_email = 'Unknown'
+        # Get user info - the ID token (openid + email scopes) usually carries the email already,
+        # so the userinfo API round-trip is only a fallback
+        user_email = get_id_token_email(credentials)
+        if not user_email:
+            try:
+                user_info_service = build_userinfo_service(credentials)
+                user_info = user_info_service.userinfo().get().execute()
+                user_email = user_info.get('email', 'Unknown')
+            except:
+                user_email = 'Unknown'
         
         # Store in session
         session['user_credentials'] = {
@@ -1378,18 +1504,16 @@ def callback():
             'token_uri': credentials.token_uri,
             'client_id': credentials.client_id,
             'client_secret': credentials.client_secret,
-            'scopes': list(credentials.scopes) if credentials.scopes else [],
+            # Scopes are always OAUTH_SCOPES - not stored, to keep the signed cookie small
             'user_email': user_email
         }
         
         # Clear OAuth state
-        session.pop('oauth_state', None)
-        session.pop('oauth_flow_credentials_file', None)
+        clear_session_keys('oauth_state', 'oauth_flow_credentials_file')
         
         return redirect(url_for('index'))
     except Exception as e:
-        print(f"Error in OAuth callback: {e}")
-        print(traceback.format_exc())
+        logger.error("Error in OAuth callback: %s", e, exc_info=DEBUG)
         return jsonify({
             'success': False,
             'error': f'OAuth callback failed: {str(e)}'
@@ -1398,24 +1522,32 @@ def callback():
 @app.route('/auth/logout', methods=['POST', 'GET'])
 def logout():
     """Logout user."""
-    session.pop('user_credentials', None)
-    session.pop('oauth_state', None)
-    session.pop('oauth_flow_credentials_file', None)
+    clear_session_keys('user_credentials', 'oauth_state', 'oauth_flow_credentials_file')
     
     if request.method == 'POST':
         return jsonify({'success': True, 'message': 'Logged out successfully'})
     return redirect(url_for('index'))
 
+def clear_session_keys(*keys):
+    """Remove several keys from the session (missing keys are ignored)."""
+    for key in keys:
+        session.pop(key, None)
+
 def get_user_credentials():
-    """Get user credentials from session or return None."""
+    """Get user credentials from session or return None (built at most once per request)."""
+    if 'user_creds' in g:
+        return g.user_creds
+    g.user_creds = _load_user_credentials()
+    return g.user_creds
+
+def _load_user_credentials():
+    """Reconstruct (and refresh if expired) the user's credentials from the session."""
     user_creds_data = session.get('user_credentials')
     
     if not user_creds_data:
         return None
     
     try:
-        from google.oauth2.credentials import Credentials
-        
         # Reconstruct credentials object
         user_creds = Credentials(
             token=user_creds_data['token'],
@@ -1423,21 +1555,21 @@ def get_user_credentials():
             token_uri=user_creds_data['token_uri'],
             client_id=user_creds_data['client_id'],
             client_secret=user_creds_data['client_secret'],
-            scopes=user_creds_data['scopes']
+            scopes=user_creds_data.get('scopes', OAUTH_SCOPES)
         )
         
         # Refresh if expired
         if user_creds.expired and user_creds.refresh_token:
             try:
-                user_creds.refresh(Request())
+                user_creds.refresh(GOOGLE_AUTH_REQUEST)
                 # Update session with new token
                 session['user_credentials']['token'] = user_creds.token
             except Exception as e:
-                print(f"Warning: Could not refresh token: {e}")
+                logger.warning("Warning: Could not refresh token: %s", e)
         
         return user_creds
     except Exception as e:
-        print(f"Error reconstructing credentials: {e}")
+        logger.error("Error reconstructing credentials: %s", e)
         return None
 
 @app.errorhandler(404)
@@ -1452,47 +1584,58 @@ def not_found(error):
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors with JSON."""
-    import traceback
-    error_details = traceback.format_exc()
-    print(f"Internal Server Error: {error_details}")
+    # Tracebacks stay in the server log; the client gets a request ID to quote instead
+    request_id = secrets.token_urlsafe(8)
+    # Log the stack of the exception that caused the 500, not just the HTTP error wrapping it
+    logger.error("[%s] Internal Server Error: %s", request_id, error,
+                 exc_info=getattr(error, 'original_exception', None) or error)
     return jsonify({
         'success': False,
         'error': 'Internal server error',
         'message': 'An unexpected error occurred. Please check the server logs.',
-        'details': str(error) if os.getenv('DEBUG', 'False').lower() == 'true' else None
+        'request_id': request_id
     }), 500
 
 @app.errorhandler(Exception)
 def handle_exception(e):
     """Handle all unhandled exceptions with JSON."""
-    import traceback
-    error_details = traceback.format_exc()
-    print(f"Unhandled Exception: {error_details}")
+    # Tracebacks stay in the server log; the client gets a request ID to quote instead
+    request_id = secrets.token_urlsafe(8)
+    logger.error("[%s] Unhandled Exception: %r", request_id, e, exc_info=e)
     return jsonify({
         'success': False,
         'error': 'An unexpected error occurred',
         'message': str(e),
-        'details': error_details if os.getenv('DEBUG', 'False').lower() == 'true' else None
+        'request_id': request_id
     }), 500
 
 if __name__ == '__main__':
     import webbrowser
     from threading import Timer
     
+    browser_opened = threading.Event()
+    
     def open_browser():
-        """Open browser after a short delay."""
+        """Open browser after a short delay (at most once per process)."""
+        if browser_opened.is_set():
+            return
+        browser_opened.set()
         webbrowser.open('http://127.0.0.1:5000')
     
+    # Only open a browser for interactive runs (skip CI, Docker, systemd, or NO_BROWSER=1)
+    should_open_browser = not os.getenv('NO_BROWSER') and sys.stdout.isatty()
+    
     print("\n" + "="*70)
     print("  🌐 Starting AI Form Creator Web Application")
     print("="*70)
     print("\n📝 Server will start at: http://127.0.0.1:5000")
-    print("💡 The browser will open automatically...")
+    if should_open_browser:
+        print("💡 The browser will open automatically...")
     print("💡 Press Ctrl+C to stop the server\n")
     
     # Open browser after 1.5 seconds
-    Timer(1.5, open_browser).start()
+    if should_open_browser:
+        Timer(1.5, open_browser).start()
     
     # Run Flask app
     app.run(host='127.0.0.1', port=5000, debug=False, use_reloader=False)
-
@@ -8,9 +8,39 @@ import json
 from pathlib import Path
 
 
+# Parsed credentials files: path -> ((mtime_ns, size), data)
+_CREDS_CACHE = {}
+
+
 class ConfigHelper:
     """Helper class for managing configuration and credentials."""
     
+    @staticmethod
+    def load_credentials_file(file_path: str = 'credentials.json') -> dict:
+        """
+        Load and parse a credentials file, reusing the cached result while the file is unchanged.
+        
+        Args:
+            file_path: Path to credentials file
+        
+        Returns:
+            Parsed JSON content
+        
+        Raises:
+            OSError: If the file cannot be read
+            json.JSONDecodeError: If the file is not valid JSON
+        """
+        st = os.stat(file_path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = _CREDS_CACHE.get(file_path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        
+        with open(file_path, 'r') as f:
+            data = json.load(f)
+        _CREDS_CACHE[file_path] = (stamp, data)
+        return data
+    
     @staticmethod
     def check_credentials_file(file_path: str = 'credentials.json') -> bool:
         """
@@ -26,12 +56,11 @@ class ConfigHelper:
             return False
         
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                # Check if it has the required OAuth structure
-                if 'installed' in data or 'web' in data:
-                    return True
-                return False
+            data = ConfigHelper.load_credentials_file(file_path)
+            # Check if it has the required OAuth structure
+            if 'installed' in data or 'web' in data:
+                return True
+            return False
         except (json.JSONDecodeError, KeyError):
             return False
     
@@ -54,9 +83,8 @@ class ConfigHelper:
             }
         
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                
+            data = ConfigHelper.load_credentials_file(file_path)
+            
             info = {
                 'exists': True,
                 'valid': True,
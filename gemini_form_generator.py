@@ -3,85 +3,320 @@ Gemini AI Integration for Google Forms Generation
 Uses Google Gemini 2.5 Flash to generate form structure from user input
 """
 
+import os
 import json
+import asyncio
 import re
+import time
+import random
+import datetime
+import hashlib
+import copy
+import io
+import functools
+import threading
+import importlib
+import mmap
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from response_cache import ResponseCache
 
+# Use orjson for JSON parsing/encoding if available (faster C implementation)
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-class GeminiFormGenerator:
-    """Generate Google Form structure using Gemini AI."""
+
+# Control characters (0x00-0x1F) that must be escaped inside JSON strings
+CONTROL_CHAR_PATTERN = re.compile(r'[\x00-\x1f]')
+# What the control-character fixer has to look at: quotes, backslashes, runs of control chars
+JSON_SPECIAL_CHAR_PATTERN = re.compile(r'["\\]|[\x00-\x1f]+')
+CONTROL_CHAR_ESCAPES = {
+    '\n': '\\n',
+    '\r': '\\r',
+    '\t': '\\t',
+    '\b': '\\b',
+    '\f': '\\f',
+}
+# Translation table escaping every control character in one str.translate() call
+CONTROL_CHAR_TRANSLATION = str.maketrans({
+    chr(code): CONTROL_CHAR_ESCAPES.get(chr(code), f'\\u{code:04x}') for code in range(0x20)
+})
+# Markdown code fences (``` or ```json) wrapped around model output
+MARKDOWN_FENCE_PATTERN = re.compile(r'```(?:json)?\s*')
+# Characters that affect JSON object nesting: braces, quotes and backslashes
+JSON_STRUCTURE_PATTERN = re.compile(r'[{}"\\]')
+# Reading passage headings at the start of a line - used to split long exam papers
+SECTION_SPLIT_PATTERN = re.compile(r'^(?=[ \t]*READING PASSAGE \d+)', re.MULTILINE)
+# Documents longer than this (in characters) are generated section by section in parallel
+PARALLEL_SECTION_THRESHOLD = 12000
+MAX_SECTION_WORKERS = 4
+# Concurrent Gemini calls made by generate_batch()
+MAX_BATCH_WORKERS = 4
+# Process-wide cap on in-flight Gemini requests - batch and section workers
+# multiply, so this keeps them under the API rate limit together
+MAX_CONCURRENT_GEMINI_CALLS = 8
+GEMINI_CALL_SLOTS = threading.BoundedSemaphore(MAX_CONCURRENT_GEMINI_CALLS)
+# How often async callers retry for a free slot (seconds) - polling on the event loop
+# instead of blocking an executor thread, so a cancelled wait holds nothing
+GEMINI_SLOT_POLL_INTERVAL = 0.05
+# Transient API errors (rate limit, overload, server errors) retried with backoff
+RETRYABLE_API_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+)
+MAX_API_ATTEMPTS = 5
+# Upper bound on one backoff delay, in seconds
+MAX_RETRY_DELAY = 30
+# The embedding model only sees roughly the first 256 tokens, so longer documents
+# (full exam papers sharing boilerplate instructions) never use the semantic cache
+SEMANTIC_CACHE_MAX_CHARS = 1000
+# Input budget for one generation (0 disables). Generous on purpose - exam papers
+# need every question - it only stops pathological uploads (e.g. whole textbooks)
+DEFAULT_MAX_INPUT_TOKENS = 100000
+# Rough characters per token for English text, so the budget is checked without an API call
+CHARS_PER_TOKEN = 4
+# Rows of a CSV/Excel upload sent to Gemini
+MAX_SPREADSHEET_ROWS = 500
+# Lifetime of the server-side cached copy of the system prompt
+CONTEXT_CACHE_TTL = datetime.timedelta(hours=1)
+
+
+@functools.lru_cache(maxsize=None)
+def load_optional_module(name: str):
+    """
+    Import an optional dependency once per process.
     
-    def __init__(self, api_key: str = None):
-        """
-        Initialize Gemini AI client.
-        
-        Args:
-            api_key: Google Gemini API key (optional, will check environment variables if not provided)
-        """
-        # Check for API key in multiple environment variables
-        if not api_key:
-            import os
-            api_key = os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_API_KEY')
-        
-        # Strip whitespace to avoid issues
-        if api_key:
-            api_key = api_key.strip()
+    Missing modules are cached too, so readers don't search sys.path again on
+    every file when e.g. pymupdf isn't installed.
+    
+    Args:
+        name: Module name (e.g. 'PyPDF2', 'pyarrow.csv')
+    
+    Returns:
+        The module, or None if it isn't installed
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def require_optional_module(name: str):
+    """Return an optional dependency, raising ImportError if it isn't installed."""
+    module = load_optional_module(name)
+    if module is None:
+        raise ImportError(f"No module named '{name}'")
+    return module
+
+
+# Gemini model chosen for each API key, shared by all GeminiFormGenerator instances
+RESOLVED_MODEL_NAMES: Dict[str, str] = {}
+
+# Gemini cached content holding the system prompt, shared by all GeminiFormGenerator instances:
+# (api_key, model_name, system_prompt) -> (CachedContent or None if unavailable, monotonic refresh time)
+CONTEXT_CACHES: Dict[tuple, tuple] = {}
+CONTEXT_CACHES_LOCK = threading.Lock()
+
+
+def get_context_cache(api_key: str, model_name: str, system_prompt: str):
+    """
+    Return the shared Gemini cached content for a model and system prompt, creating it on first use.
+    
+    Each CachedContent.create is a billed API call, so one cached copy is reused by every
+    generator until a minute before it expires. Not every model/key supports context
+    caching (and very short prompts are rejected); a failure is remembered for one TTL
+    so requests don't retry it each time.
+    
+    Args:
+        api_key: Google Gemini API key
+        model_name: Short model name (e.g. 'gemini-2.5-flash')
+        system_prompt: System instruction to cache
+    
+    Returns:
+        CachedContent, or None if context caching is unavailable
+    """
+    key = (api_key, model_name, system_prompt)
+    with CONTEXT_CACHES_LOCK:
+        entry = CONTEXT_CACHES.get(key)
+        if entry is not None and time.monotonic() < entry[1]:
+            return entry[0]
         
-        if not api_key:
-            raise ValueError(
-                "No API key found. Please set GEMINI_API_KEY or GOOGLE_API_KEY environment variable. "
-                "Get your key from: https://aistudio.google.com/app/apikey"
+        # An expiring copy isn't deleted - requests still using it finish before the server drops it
+        try:
+            cached_content = genai.caching.CachedContent.create(
+                model=f'models/{model_name}',
+                system_instruction=system_prompt,
+                ttl=CONTEXT_CACHE_TTL,
             )
+            print("✅ System prompt cached on Gemini (context cache)")
+            refresh_at = time.monotonic() + CONTEXT_CACHE_TTL.total_seconds() - 60
+        except Exception as e:
+            print(f"⚠️  Gemini context cache unavailable, sending system prompt with each request: {e}")
+            cached_content = None
+            refresh_at = time.monotonic() + CONTEXT_CACHE_TTL.total_seconds()
+        CONTEXT_CACHES[key] = (cached_content, refresh_at)
+        return cached_content
+
+
+@functools.lru_cache(maxsize=8)
+def get_available_models(api_key: str) -> frozenset:
+    """
+    List the Gemini models that support generateContent for an API key.
+    
+    Cached per key so every GeminiFormGenerator instance shares one registry call
+    (failed calls raise and are not cached). genai.configure(api_key=...) must
+    have been called first.
+    
+    Args:
+        api_key: Google Gemini API key
+    
+    Returns:
+        Set of short model names (e.g. 'gemini-2.5-flash')
+    """
+    return frozenset(
+        model.name.split('/')[-1]
+        for model in genai.list_models()
+        if 'generateContent' in model.supported_generation_methods
+    )
+
+
+def parse_json(text: str) -> Any:
+    """
+    Parse JSON with orjson when installed, falling back to the stdlib parser.
+    
+    The stdlib fallback runs with strict=False, so raw control characters inside
+    strings (common in Gemini output) are accepted.
+    
+    Args:
+        text: JSON text
+    
+    Returns:
+        Parsed value
+    
+    Raises:
+        json.JSONDecodeError: If neither parser accepts the text
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text, strict=False)
+
+
+def dump_json(value: Any) -> str:
+    """Serialize a value to compact JSON, using orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(value)
+
+
+class JsonObjectScanner:
+    """Track the brace depth of a JSON object across pieces of text, ignoring braces inside strings."""
+    
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escape_next = False
+    
+    def feed(self, text: str, pos: int = 0) -> int:
+        """
+        Scan the next piece of text (quote/escape rules match _fix_json_control_characters).
         
-        self.api_key = api_key
-        genai.configure(api_key=api_key)
-        
-        # PRIMARY MODEL: gemini-2.5-flash is the main and preferred model
-        # Fallback models are only used if the primary model is unavailable
-        primary_model = 'gemini-2.5-flash'
-        fallback_models = [
-            'gemini-2.0-flash-exp',
-            'gemini-1.5-flash',
-            'gemini-1.5-pro',
-            'gemini-pro'
-        ]
+        Args:
+            text: Next piece of the JSON text
+            pos: Index in text to start scanning from
         
-        self.model = None
-        last_error = None
+        Returns:
+            Index just past the brace closing the top-level object, or -1 if it is still open
+        """
+        # An escape started at the end of the previous piece consumes this piece's first char
+        if self.escape_next and pos < len(text):
+            pos += 1
+            self.escape_next = False
         
-        # Try primary model first
-        try:
-            self.model = genai.GenerativeModel(primary_model)
-            print(f"✅ Using PRIMARY Gemini model: {primary_model}")
-        except Exception as e:
-            last_error = str(e)
-            print(f"⚠️  Primary model {primary_model} unavailable: {last_error}")
-            print(f"🔄 Trying fallback models...")
+        while True:
+            match = JSON_STRUCTURE_PATTERN.search(text, pos)
+            if match is None:
+                return -1
+            char = match.group()
+            pos = match.end()
             
-            # Try fallback models only if primary fails
-            for model_name in fallback_models:
-                try:
-                    self.model = genai.GenerativeModel(model_name)
-                    print(f"✅ Using FALLBACK Gemini model: {model_name}")
-                    break
-                except Exception as e:
-                    last_error = str(e)
-                    print(f"⚠️  Could not use {model_name}: {last_error}")
-                    continue
-        
-        if self.model is None:
-            error_msg = f"Could not initialize Gemini model. "
-            error_msg += f"Primary model ({primary_model}) and all fallback models failed. "
-            if last_error:
-                error_msg += f"Last error: {last_error}. "
-            error_msg += "Please check your API key is valid and has access to Gemini API."
-            raise ValueError(error_msg)
-        
-        # System prompt for form generation
-        self.system_prompt = """You are an expert at creating Google Forms for English reading and listening exams. 
-When given content (text, documents, exam papers), analyze it and generate a comprehensive exam form structure that matches standard IELTS/TOEFL format.
+            if char == '\\':
+                if pos < len(text):
+                    pos += 1
+                else:
+                    self.escape_next = True
+            elif char == '"':
+                self.in_string = not self.in_string
+            elif not self.in_string:
+                if char == '{':
+                    self.depth += 1
+                    self.started = True
+                else:
+                    self.depth -= 1
+                    if self.started and self.depth == 0:
+                        return pos
 
+
+# Structured-output schema for Gemini JSON mode (OpenAPI subset - no union types).
+# The model is constrained to it server-side, so the schema no longer needs to be
+# spelled out in the system prompt.
+GEMINI_QUESTION_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'text': {'type': 'string'},
+        'type': {'type': 'string', 'enum': ['choice', 'text']},
+        'required': {'type': 'boolean'},
+        'options': {'type': 'array', 'items': {'type': 'string'}},
+    },
+    'required': ['text', 'type', 'options'],
+}
+GEMINI_RESPONSE_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': 'string'},
+        'description': {'type': 'string'},
+        'sections': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'title': {'type': 'string'},
+                    'description': {'type': 'string'},
+                    'question_groups': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'title': {'type': 'string'},
+                                'description': {'type': 'string'},
+                                'questions': {'type': 'array', 'items': GEMINI_QUESTION_SCHEMA},
+                            },
+                            'required': ['questions'],
+                        },
+                    },
+                },
+                'required': ['question_groups'],
+            },
+        },
+    },
+    'required': ['title', 'sections'],
+}
+# Older models without JSON mode get the structure spelled out in the system prompt instead
+JSON_MODE_UNSUPPORTED_MODELS = {'gemini-pro'}
+RESPONSE_FORMAT_EXAMPLE = """
 Your response must be in JSON format with the following structure:
 {
     "title": "Form Title",
@@ -107,6 +342,98 @@ Your response must be in JSON format with the following structure:
         }
     ]
 }
+"""
+
+# Shape of the form structure the system prompt asks for. Only types are checked -
+# every field stays optional so harmless omissions from the model still go through.
+QUESTION_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'text': {'type': 'string'},
+        'type': {'type': 'string'},
+        'options': {'type': 'array'},
+    },
+}
+FORM_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': ['string', 'null']},
+        'description': {'type': ['string', 'null']},
+        'questions': {'type': 'array', 'items': QUESTION_SCHEMA},
+        'sections': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'questions': {'type': 'array', 'items': QUESTION_SCHEMA},
+                    'question_groups': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'questions': {'type': 'array', 'items': QUESTION_SCHEMA},
+                            },
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
+# Validate generated structures with a compiled validator if fastjsonschema is available
+try:
+    import fastjsonschema
+    validate_form_structure = fastjsonschema.compile(FORM_SCHEMA)
+except ImportError:
+    # fastjsonschema not installed, skip structure validation
+    validate_form_structure = None
+
+
+class GeminiFormGenerator:
+    """Generate Google Form structure using Gemini AI."""
+    
+    # Optional file-reader imports are warmed once per process
+    _imports_warmed = False
+    
+    def __init__(self, api_key: str = None, cache_ttl_days: float = None,
+                 semantic_threshold: float = None, semantic_top_k: int = 5,
+                 max_input_tokens: int = None):
+        """
+        Initialize Gemini AI client.
+        
+        Args:
+            api_key: Google Gemini API key (optional, will check environment variables if not provided)
+            cache_ttl_days: Days to keep cached responses (optional, defaults to GEMINI_CACHE_TTL_DAYS or 7; 0 disables the response cache)
+            semantic_threshold: Cosine similarity for reusing the form of a paraphrased request
+                (optional, defaults to GEMINI_SEMANTIC_CACHE_THRESHOLD; unset disables the semantic cache)
+            semantic_top_k: Nearest cached requests to consider per semantic lookup
+            max_input_tokens: Longest document sent to Gemini, in estimated tokens (optional,
+                defaults to GEMINI_MAX_INPUT_TOKENS or 100000; 0 disables the limit)
+        """
+        # Check for API key in multiple environment variables
+        if not api_key:
+            api_key = os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_API_KEY')
+        
+        # Strip whitespace to avoid issues
+        if api_key:
+            api_key = api_key.strip()
+        
+        if not api_key:
+            raise ValueError(
+                "No API key found. Please set GEMINI_API_KEY or GOOGLE_API_KEY environment variable. "
+                "Get your key from: https://aistudio.google.com/app/apikey"
+            )
+        
+        self.api_key = api_key
+        genai.configure(api_key=api_key)
+        
+        # System prompt for form generation - sent once as the model's system
+        # instruction so each request only carries the document itself
+        self.system_prompt = """You are an expert at creating Google Forms for English reading and listening exams. 
+When given content (text, documents, exam papers), analyze it and generate a comprehensive exam form structure that matches standard IELTS/TOEFL format.
+
+Your response is JSON following the provided response schema: a form title and description, then sections containing question_groups containing questions.
 
 IMPORTANT STRUCTURE NOTES:
 - ALWAYS use "sections" array (even if document has no clear sections, create one section)
@@ -215,6 +542,167 @@ FORM STRUCTURE BEST PRACTICES:
 - Maintain question numbering sequence across all sections
 
 Generate the exam form structure based on the content provided. Extract ALL questions, organize them into proper sections with reading passages, and group them logically. Do not miss any questions."""
+        
+        # PRIMARY MODEL: gemini-2.5-flash is the main and preferred model
+        # Fallback models are only used if the primary model is unavailable
+        primary_model = 'gemini-2.5-flash'
+        fallback_models = [
+            'gemini-2.0-flash-exp',
+            'gemini-1.5-flash',
+            'gemini-1.5-pro',
+            'gemini-pro'
+        ]
+        
+        self.model = None
+        self.model_name = None
+        last_error = None
+        
+        # A model already resolved for this key in this process is reused as-is
+        resolved_model = RESOLVED_MODEL_NAMES.get(api_key)
+        if resolved_model:
+            candidates = [resolved_model]
+            available = None
+        else:
+            # Ask the model registry once which models this key can use, so a dead
+            # primary doesn't cost a probe per fallback candidate
+            candidates = [primary_model] + fallback_models
+            try:
+                available = get_available_models(api_key)
+            except Exception as e:
+                print(f"⚠️  Could not list Gemini models, probing candidates directly: {e}")
+                available = None
+        if available:
+            supported = [name for name in candidates if name in available]
+            if supported:
+                candidates = supported
+            if primary_model not in available:
+                print(f"⚠️  Primary model {primary_model} unavailable for this API key")
+        
+        base_system_prompt = self.system_prompt
+        for model_name in candidates:
+            try:
+                if model_name in JSON_MODE_UNSUPPORTED_MODELS:
+                    system_prompt = base_system_prompt + RESPONSE_FORMAT_EXAMPLE
+                    generation_config = None
+                else:
+                    # JSON mode: the response is constrained to the schema server-side
+                    system_prompt = base_system_prompt
+                    generation_config = {
+                        'response_mime_type': 'application/json',
+                        'response_schema': GEMINI_RESPONSE_SCHEMA,
+                    }
+                self.model = genai.GenerativeModel(
+                    model_name,
+                    system_instruction=system_prompt,
+                    generation_config=generation_config
+                )
+                self.model_name = model_name
+                self.system_prompt = system_prompt
+                self.generation_config = generation_config
+                # Only remember models confirmed by the registry - a bare
+                # GenerativeModel() construction doesn't check availability
+                if available:
+                    RESOLVED_MODEL_NAMES[api_key] = model_name
+                if model_name == primary_model:
+                    print(f"✅ Using PRIMARY Gemini model: {model_name}")
+                else:
+                    print(f"✅ Using FALLBACK Gemini model: {model_name}")
+                break
+            except Exception as e:
+                last_error = str(e)
+                print(f"⚠️  Could not use {model_name}: {last_error}")
+                if model_name == primary_model:
+                    print(f"🔄 Trying fallback models...")
+                continue
+        
+        if self.model is None:
+            error_msg = f"Could not initialize Gemini model. "
+            error_msg += f"Primary model ({primary_model}) and all fallback models failed. "
+            if last_error:
+                error_msg += f"Last error: {last_error}. "
+            error_msg += "Please check your API key is valid and has access to Gemini API."
+            raise ValueError(error_msg)
+        
+        # The system prompt goes to Gemini as cached content on the first generation
+        # (see _get_model), so constructing a generator makes no billed call
+        self._context_model = (None, None)
+        
+        # Persistent response cache - repeated documents skip the Gemini call entirely
+        self.cache = None
+        if cache_ttl_days is None:
+            try:
+                cache_ttl_days = float(os.getenv('GEMINI_CACHE_TTL_DAYS', 7))
+            except ValueError:
+                print("⚠️  Invalid GEMINI_CACHE_TTL_DAYS, using 7 days")
+                cache_ttl_days = 7
+        if cache_ttl_days:
+            try:
+                self.cache = ResponseCache(ttl_days=cache_ttl_days)
+            except Exception as e:
+                print(f"⚠️  Response cache disabled: {e}")
+        
+        # Input budget - longer documents keep their beginning and end only
+        if max_input_tokens is None:
+            try:
+                max_input_tokens = int(os.getenv('GEMINI_MAX_INPUT_TOKENS', DEFAULT_MAX_INPUT_TOKENS))
+            except ValueError:
+                print(f"⚠️  Invalid GEMINI_MAX_INPUT_TOKENS, using {DEFAULT_MAX_INPUT_TOKENS}")
+                max_input_tokens = DEFAULT_MAX_INPUT_TOKENS
+        self.max_input_tokens = max_input_tokens
+        
+        # Optional semantic cache - short form descriptions worded differently share one entry
+        self.semantic_cache = None
+        if semantic_threshold is None and os.getenv('GEMINI_SEMANTIC_CACHE_THRESHOLD'):
+            try:
+                semantic_threshold = float(os.getenv('GEMINI_SEMANTIC_CACHE_THRESHOLD'))
+            except ValueError:
+                print("⚠️  Invalid GEMINI_SEMANTIC_CACHE_THRESHOLD, semantic cache disabled")
+        if semantic_threshold:
+            try:
+                # Imported here so sentence-transformers (and torch) only load when enabled
+                from semantic_cache import SemanticCache
+                self.semantic_cache = SemanticCache(
+                    namespace=ResponseCache.make_key(self.model_name, self.system_prompt),
+                    threshold=semantic_threshold,
+                    top_k=semantic_top_k,
+                    # Same expiry as exact-match entries, so a paraphrase can't outlive them
+                    ttl_days=cache_ttl_days
+                )
+                print(f"✅ Semantic cache enabled (similarity >= {semantic_threshold})")
+            except Exception as e:
+                print(f"⚠️  Semantic cache disabled: {e}")
+        
+        # Import the optional file readers in the background so the first upload
+        # doesn't pay their import time on the request path
+        if not GeminiFormGenerator._imports_warmed:
+            GeminiFormGenerator._imports_warmed = True
+            threading.Thread(target=self._warm_imports, daemon=True).start()
+    
+    def _get_model(self):
+        """Return the model to call: bound to the shared context cache when available, else the plain model."""
+        cached_content = get_context_cache(self.api_key, self.model_name, self.system_prompt)
+        if cached_content is None:
+            return self.model
+        
+        # Rebuild the cached-content model only when the shared cache was (re)created
+        bound_content, model = self._context_model
+        if bound_content is not cached_content:
+            model = genai.GenerativeModel.from_cached_content(
+                cached_content=cached_content,
+                generation_config=self.generation_config
+            )
+            self._context_model = (cached_content, model)
+        return model
+    
+    @staticmethod
+    def _warm_imports():
+        """Import the optional file-reading libraries used by _read_file, ignoring missing ones."""
+        for module_name in ('pymupdf', 'pypdfium2', 'PyPDF2', 'docx', 'pandas', 'pyarrow', 'pyarrow.csv'):
+            try:
+                load_optional_module(module_name)
+            except Exception:
+                # Broken install - _read_file reports it when actually needed
+                pass
 
     def generate_from_text(self, text: str) -> Dict[str, Any]:
         """
@@ -226,9 +714,460 @@ Generate the exam form structure based on the content provided. Extract ALL ques
         Returns:
             Dictionary containing form structure (title, description, questions)
         """
-        prompt = f"""{self.system_prompt}
-
-EXAM DOCUMENT CONTENT:
+        cached, cache_key, semantic_text = self._lookup_cached(text)
+        if cached is not None:
+            return cached
+        
+        text = self._truncate_input(text)
+        sections = self._split_sections(text) if len(text) > PARALLEL_SECTION_THRESHOLD else []
+        if len(sections) > 1:
+            form_structure = self._generate_sections(sections)
+        else:
+            form_structure = self._generate_uncached(text)
+        
+        self._store_generated(form_structure, cache_key, semantic_text)
+        return form_structure
+    
+    def generate_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Generate form structures for several documents.
+        
+        Identical documents (after normalization) are generated once, cache hits
+        for the whole batch come from a single cache query, and the remaining
+        Gemini calls run in parallel.
+        
+        Args:
+            texts: Document texts
+        
+        Returns:
+            Form structures in the same order as texts
+        """
+        results = [None] * len(texts)
+        
+        # Group indexes by cache key so each distinct document is handled once
+        groups = {}
+        for i, text in enumerate(texts):
+            key = ResponseCache.text_key(self.model_name, self.system_prompt, text)
+            groups.setdefault(key, []).append(i)
+        
+        hits = {}
+        if self.cache:
+            try:
+                hits = self.cache.get_many(list(groups))
+            except Exception as e:
+                print(f"⚠️  Could not read response cache: {e}")
+        if hits:
+            print(f"⚡ Using cached form structures for {len(hits)} of {len(groups)} documents")
+        
+        misses = []
+        for key, indexes in groups.items():
+            if key in hits:
+                for i in indexes:
+                    results[i] = parse_json(hits[key])
+            else:
+                misses.append(indexes)
+        
+        if misses:
+            with ThreadPoolExecutor(max_workers=min(MAX_BATCH_WORKERS, len(misses))) as executor:
+                structures = list(executor.map(lambda indexes: self.generate_from_text(texts[indexes[0]]), misses))
+            for indexes, form_structure in zip(misses, structures):
+                results[indexes[0]] = form_structure
+                # Duplicates get their own copy so callers can edit one without touching the others
+                for i in indexes[1:]:
+                    results[i] = copy.deepcopy(form_structure)
+        
+        return results
+    
+    async def agenerate_from_text(self, text: str) -> Dict[str, Any]:
+        """
+        Async version of generate_from_text() - Gemini calls don't block the event loop.
+        
+        Args:
+            text: User's text input describing the form or requirements
+        
+        Returns:
+            Dictionary containing form structure (title, description, questions)
+        """
+        # Cache lookups hit SQLite (and the embedding model), so keep them off the event loop
+        cached, cache_key, semantic_text = await asyncio.to_thread(self._lookup_cached, text)
+        if cached is not None:
+            return cached
+        
+        text = self._truncate_input(text)
+        sections = self._split_sections(text) if len(text) > PARALLEL_SECTION_THRESHOLD else []
+        if len(sections) > 1:
+            print(f"📚 Large document: generating {len(sections)} sections concurrently...")
+            results = await asyncio.gather(*(
+                self._agenerate_uncached(section, self._build_section_prompt(section, number, len(sections)))
+                for number, section in enumerate(sections, 1)
+            ))
+            form_structure = self._merge_sections(results)
+        else:
+            form_structure = await self._agenerate_uncached(text)
+        
+        await asyncio.to_thread(self._store_generated, form_structure, cache_key, semantic_text)
+        return form_structure
+    
+    async def agenerate_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Generate form structures for several documents concurrently.
+        
+        Cache hits return immediately; the remaining Gemini calls overlap
+        (subject to the API key's rate limits).
+        
+        Args:
+            texts: Document texts
+        
+        Returns:
+            Form structures in the same order as texts
+        """
+        return list(await asyncio.gather(*(self.agenerate_from_text(text) for text in texts)))
+    
+    def _truncate_input(self, text: str) -> str:
+        """
+        Keep a document within the input token budget.
+        
+        Over-budget documents keep their beginning and end (title, instructions,
+        last sections) with a marker where the middle was cut.
+        
+        Args:
+            text: Document text
+        
+        Returns:
+            Text of at most roughly max_input_tokens tokens
+        """
+        if not self.max_input_tokens:
+            return text
+        
+        budget = self.max_input_tokens * CHARS_PER_TOKEN
+        if len(text) <= budget:
+            return text
+        
+        half = budget // 2
+        omitted = len(text) - 2 * half
+        print(f"⚠️  Document is about {len(text) // CHARS_PER_TOKEN} tokens, over the "
+              f"{self.max_input_tokens}-token input budget - sending its beginning and end only")
+        return f"{text[:half]}\n\n[... {omitted} characters omitted ...]\n\n{text[-half:]}"
+    
+    def _lookup_cached(self, text: str):
+        """
+        Check the response cache, then the semantic cache, for a form structure.
+        
+        Args:
+            text: User's text input
+        
+        Returns:
+            Tuple of (cached form structure or None, response cache key, semantic cache text)
+            - the keys are passed to _store_generated() on a miss
+        """
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.text_key(self.model_name, self.system_prompt, text)
+            cached = self._get_cached_structure(cache_key)
+            if cached is not None:
+                return cached, cache_key, None
+        
+        semantic_text = None
+        if self.semantic_cache and len(text) <= SEMANTIC_CACHE_MAX_CHARS:
+            semantic_text = ResponseCache.normalize_text(text)
+            try:
+                cached = self.semantic_cache.get(semantic_text)
+            except Exception as e:
+                print(f"⚠️  Could not read semantic cache: {e}")
+                cached = None
+            if cached is not None:
+                print("⚡ Using cached form structure (a similar request was processed before)")
+                return parse_json(cached), cache_key, semantic_text
+        
+        return None, cache_key, semantic_text
+    
+    def _store_generated(self, form_structure: Dict[str, Any], cache_key: Optional[str], semantic_text: Optional[str]):
+        """
+        Validate a freshly generated form structure and store it in the caches.
+        
+        Args:
+            form_structure: Generated form structure
+            cache_key: Response cache key from _lookup_cached()
+            semantic_text: Semantic cache text from _lookup_cached()
+        """
+        # Reject malformed structures before they are cached or turned into a form
+        if validate_form_structure is not None:
+            try:
+                validate_form_structure(form_structure)
+            except fastjsonschema.JsonSchemaException as e:
+                raise ValueError(f"AI response does not match the expected form structure: {e.message}")
+        
+        if cache_key:
+            self._set_cached_structure(cache_key, form_structure)
+        if semantic_text:
+            try:
+                self.semantic_cache.set(semantic_text, dump_json(form_structure))
+            except Exception as e:
+                print(f"⚠️  Could not write semantic cache: {e}")
+    
+    def _get_cached_structure(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a form structure in the response cache.
+        
+        Args:
+            cache_key: Key from ResponseCache.make_key()
+        
+        Returns:
+            Cached form structure, or None on a miss or cache error
+        """
+        try:
+            cached = self.cache.get(cache_key)
+        except Exception as e:
+            print(f"⚠️  Could not read response cache: {e}")
+            return None
+        if cached is None:
+            return None
+        print("⚡ Using cached form structure (this content was processed before)")
+        return parse_json(cached)
+    
+    def _set_cached_structure(self, cache_key: str, form_structure: Dict[str, Any]):
+        """Store a form structure in the response cache, ignoring cache errors."""
+        try:
+            self.cache.set(cache_key, dump_json(form_structure))
+        except Exception as e:
+            print(f"⚠️  Could not write response cache: {e}")
+    
+    def _split_sections(self, text: str) -> List[str]:
+        """
+        Split an exam document into one chunk per reading passage.
+        
+        Any preamble before the first passage (exam title, general instructions)
+        is kept with the first passage so it isn't generated on its own.
+        
+        Args:
+            text: Full document text
+        
+        Returns:
+            List of section texts (a single item if no passage headings were found)
+        """
+        sections = [part for part in SECTION_SPLIT_PATTERN.split(text) if part.strip()]
+        if len(sections) > 1 and not sections[0].lstrip().startswith('READING PASSAGE'):
+            sections[1] = sections[0] + sections[1]
+            del sections[0]
+        return sections
+    
+    def _generate_sections(self, sections: List[str]) -> Dict[str, Any]:
+        """
+        Generate form structures for document sections in parallel and merge them.
+        
+        Args:
+            sections: Section texts from _split_sections()
+        
+        Returns:
+            Dictionary containing the merged form structure
+        """
+        print(f"📚 Large document: generating {len(sections)} sections in parallel...")
+        # Each call is told which part of the exam it has, not asked for the whole exam
+        prompts = [self._build_section_prompt(section, number, len(sections))
+                   for number, section in enumerate(sections, 1)]
+        with ThreadPoolExecutor(max_workers=min(MAX_SECTION_WORKERS, len(sections))) as executor:
+            results = list(executor.map(self._generate_uncached, sections, prompts))
+        
+        return self._merge_sections(results)
+    
+    def _merge_sections(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merge per-section form structures (in document order) into one.
+        
+        Args:
+            results: Form structures generated for each section
+        
+        Returns:
+            Dictionary containing the merged form structure
+        """
+        # Title and description come from the first section (it carries the preamble)
+        merged = {
+            'title': results[0].get('title', ''),
+            'description': results[0].get('description', ''),
+            'sections': [],
+        }
+        for result in results:
+            merged['sections'].extend(result.get('sections', []))
+            if result.get('questions'):
+                merged.setdefault('questions', []).extend(result['questions'])
+        
+        return merged
+    
+    def _stream_response_text(self, prompt: str) -> str:
+        """
+        Stream a Gemini response, stopping as soon as the top-level JSON object closes.
+        
+        Anything the model appends after the object - closing code fences,
+        commentary - is never waited for.
+        
+        Args:
+            prompt: Prompt to send
+        
+        Returns:
+            Response text received so far
+        """
+        response = self._get_model().generate_content(prompt, stream=True)
+        
+        parts = []
+        scanner = JsonObjectScanner()
+        no_text_error = None
+        
+        for chunk in response:
+            try:
+                piece = chunk.text
+            except ValueError as e:
+                # Chunk without text parts (e.g. finish/safety metadata)
+                no_text_error = e
+                continue
+            parts.append(piece)
+            
+            end = scanner.feed(piece)
+            if end != -1:
+                # Drop whatever follows the closing brace in this chunk
+                parts[-1] = piece[:end]
+                self._close_stream(response)
+                return ''.join(parts)
+        
+        text = ''.join(parts)
+        if not text.strip():
+            # Blocked or empty response - report why instead of handing '' to the JSON parser
+            try:
+                finish_reason = response.candidates[0].finish_reason if response.candidates else None
+            except Exception:
+                finish_reason = None
+            raise ValueError(
+                f"Gemini returned no text (finish_reason: {finish_reason}, "
+                f"prompt_feedback: {getattr(response, 'prompt_feedback', None)})"
+                + (f": {no_text_error}" if no_text_error else "")
+            )
+        return text
+    
+    @staticmethod
+    def _close_stream(response):
+        """
+        Stop receiving a streamed response we no longer need.
+        
+        The SDK has no public close; cancel the underlying gRPC stream (or close
+        the REST generator) when it exposes one, so the connection is released
+        instead of left half-read.
+        """
+        iterator = getattr(response, '_iterator', None)
+        close = getattr(iterator, 'cancel', None) or getattr(iterator, 'close', None)
+        if close is not None:
+            try:
+                close()
+            except Exception:
+                pass
+    
+    @staticmethod
+    def _retry_delay(attempt: int) -> float:
+        """Exponential backoff with full jitter, so parallel workers don't retry in lockstep."""
+        return random.uniform(0, min(MAX_RETRY_DELAY, 2 ** attempt))
+    
+    def _call_model(self, prompt: str) -> str:
+        """
+        Send a prompt to Gemini, retrying transient API errors with backoff.
+        
+        Args:
+            prompt: Prompt to send
+        
+        Returns:
+            Response text
+        """
+        for attempt in range(1, MAX_API_ATTEMPTS + 1):
+            try:
+                with GEMINI_CALL_SLOTS:
+                    return self._stream_response_text(prompt)
+            except RETRYABLE_API_ERRORS as e:
+                if attempt == MAX_API_ATTEMPTS:
+                    raise
+                delay = self._retry_delay(attempt)
+                print(f"⚠️  Gemini API error ({type(e).__name__}), retrying in {delay:.1f}s "
+                      f"(attempt {attempt}/{MAX_API_ATTEMPTS})")
+                time.sleep(delay)
+    
+    async def _acall_model(self, prompt: str) -> str:
+        """
+        Async version of _call_model().
+        
+        Args:
+            prompt: Prompt to send
+        
+        Returns:
+            Response text
+        """
+        for attempt in range(1, MAX_API_ATTEMPTS + 1):
+            try:
+                # The semaphore is shared with worker threads; try it without blocking and
+                # sleep in between, so cancellation can only land while no slot is held
+                while not GEMINI_CALL_SLOTS.acquire(blocking=False):
+                    await asyncio.sleep(GEMINI_SLOT_POLL_INTERVAL)
+                try:
+                    # _get_model() may create the context cache over the network
+                    model = await asyncio.to_thread(self._get_model)
+                    response = await model.generate_content_async(prompt)
+                    return response.text
+                finally:
+                    GEMINI_CALL_SLOTS.release()
+            except RETRYABLE_API_ERRORS as e:
+                if attempt == MAX_API_ATTEMPTS:
+                    raise
+                delay = self._retry_delay(attempt)
+                print(f"⚠️  Gemini API error ({type(e).__name__}), retrying in {delay:.1f}s "
+                      f"(attempt {attempt}/{MAX_API_ATTEMPTS})")
+                await asyncio.sleep(delay)
+    
+    def _generate_uncached(self, text: str, prompt: str = None) -> Dict[str, Any]:
+        """
+        Call Gemini and parse its response into a form structure (no caching).
+        
+        Args:
+            text: User's text input describing the form or requirements
+            prompt: Prompt to send instead of _build_prompt(text) (e.g. for one section)
+        
+        Returns:
+            Dictionary containing form structure
+        """
+        try:
+            response_text = self._call_model(prompt or self._build_prompt(text))
+        except Exception as e:
+            print(f"Error generating form: {e}")
+            raise
+        
+        return self._parse_response_text(response_text)
+    
+    async def _agenerate_uncached(self, text: str, prompt: str = None) -> Dict[str, Any]:
+        """
+        Async version of _generate_uncached().
+        
+        Args:
+            text: User's text input describing the form or requirements
+            prompt: Prompt to send instead of _build_prompt(text) (e.g. for one section)
+        
+        Returns:
+            Dictionary containing form structure
+        """
+        try:
+            response_text = await self._acall_model(prompt or self._build_prompt(text))
+        except Exception as e:
+            print(f"Error generating form: {e}")
+            raise
+        
+        return self._parse_response_text(response_text)
+    
+    def _build_prompt(self, text: str) -> str:
+        """
+        Build the per-request prompt for a document.
+        
+        Args:
+            text: User's text input describing the form or requirements
+        
+        Returns:
+            Prompt text
+        """
+        # The system prompt travels as the model's system instruction (static prefix),
+        # so only the per-document part is sent here
+        return f"""EXAM DOCUMENT CONTENT:
 {text}
 
 CRITICAL INSTRUCTIONS:
@@ -243,16 +1182,69 @@ CRITICAL INSTRUCTIONS:
 7. For multiple choice questions (type "choice"), extract all options and remove labels (A, B, C, D)
 
 Generate a Google Form structure based on the exam document above. Return ONLY valid JSON, no additional text or explanation. Ensure ALL questions are included with correct types."""
+    
+    def _build_section_prompt(self, text: str, number: int, total: int) -> str:
+        """
+        Build the prompt for one part of a document generated section by section.
+        
+        The system instruction's question-count rules are written for a whole exam;
+        this prompt tells the model it only has one part, so it doesn't pad a single
+        passage up to the exam's total.
+        
+        Args:
+            text: Section text from _split_sections()
+            number: Position of the section (1-based)
+            total: Number of sections the document was split into
+        
+        Returns:
+            Prompt text
+        """
+        preamble_note = (
+            "\nThis part starts with the exam's preamble; use it for the form title and description only.\n"
+            if number == 1 else ""
+        )
+        return f"""EXAM DOCUMENT PART {number} OF {total}:
+{text}
+{preamble_note}
+CRITICAL INSTRUCTIONS:
+1. The text above is only part {number} of {total} of a larger exam; the other parts are processed separately
+2. Any total number of questions stated in the exam applies to the whole document, not to this part - do not use it here
+3. Extract exactly the questions that appear in this part - do not add, invent or repeat questions to reach a count
+4. Identify question types correctly:
+   - Questions with options (A, B, C, D) → type "choice" with options array
+   - Questions with blanks (……………………… or ______) and NO options → type "text" with empty options array []
+5. For fill-in-the-blank questions (type "text"), keep the blank markers in the question text
+6. For multiple choice questions (type "choice"), extract all options and remove labels (A, B, C, D)
+
+Generate a Google Form structure for this part of the exam. Return ONLY valid JSON, no additional text or explanation."""
+    
+    def _parse_response_text(self, response_text: str) -> Dict[str, Any]:
+        """
+        Parse a Gemini response into a form structure, repairing common JSON issues.
+        
+        Args:
+            response_text: Raw response text
+        
+        Returns:
+            Dictionary containing form structure
+        """
+        response_text = response_text.strip()
+        
+        # JSON mode and the streaming reader already hand over a bare object, so try
+        # it as-is before paying for another full scan in _clean_json_response
+        if response_text.startswith('{'):
+            try:
+                return parse_json(response_text)
+            except json.JSONDecodeError:
+                pass
         
         try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
-            
             # Clean the response - remove markdown code blocks if present
             response_text = self._clean_json_response(response_text)
             
-            # Parse JSON
-            form_structure = json.loads(response_text)
+            # Parse JSON - strict=False accepts raw control characters inside strings,
+            # so the common case never needs the slower fixer below
+            form_structure = parse_json(response_text)
             return form_structure
             
         except json.JSONDecodeError as e:
@@ -262,15 +1254,15 @@ Generate a Google Form structure based on the exam document above. Return ONLY v
             
             # Try to fix common JSON issues
             try:
-                # Remove markdown if present
-                cleaned = self._clean_json_response(response_text)
+                # response_text was already cleaned of markdown above
+                cleaned = response_text
                 
                 # Always try to fix control characters if JSON parsing fails
                 # (control characters are a common issue with Gemini responses)
                 print("Attempting to fix control characters in JSON strings...")
                 cleaned = self._fix_json_control_characters(cleaned)
                 
-                form_structure = json.loads(cleaned)
+                form_structure = parse_json(cleaned)
                 print("✅ Successfully fixed and parsed JSON!")
                 return form_structure
             except json.JSONDecodeError as e2:
@@ -282,7 +1274,7 @@ Generate a Google Form structure based on the exam document above. Return ONLY v
                     cleaned = cleaned.replace('\x00', '')  # Remove null bytes
                     cleaned = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f]', '', cleaned)  # Remove other control chars outside strings
                     
-                    form_structure = json.loads(cleaned)
+                    form_structure = parse_json(cleaned)
                     print("✅ Successfully parsed after aggressive cleaning!")
                     return form_structure
                 except Exception as e3:
@@ -293,9 +1285,6 @@ Generate a Google Form structure based on the exam document above. Return ONLY v
                         f"Aggressive fix error: {e3}\n"
                         f"Response preview: {response_text[:1000]}"
                     )
-        except Exception as e:
-            print(f"Error generating form: {e}")
-            raise
     
     def generate_from_file(self, file_path: str, file_type: str = None) -> Dict[str, Any]:
         """
@@ -314,34 +1303,159 @@ Generate a Google Form structure based on the exam document above. Return ONLY v
         # Generate form from content
         return self.generate_from_text(content)
     
-    def _read_file(self, file_path: str, file_type: str = None) -> str:
+    def _read_text_file(self, file_path: str, errors: str = 'strict') -> str:
         """
-        Read file content based on file type.
+        Read a UTF-8 text file by decoding straight from a memory map.
+        
+        Avoids the intermediate bytes copy a buffered read makes, which halves
+        peak memory on large transcripts.
         
         Args:
             file_path: Path to file
-            file_type: File type extension
+            errors: Decode error handling ('strict' or 'ignore')
+        
+        Returns:
+            File content as string (newlines normalized to \\n, like text mode)
+        """
+        with open(file_path, 'rb') as f:
+            # mmap can't map an empty file
+            if os.fstat(f.fileno()).st_size == 0:
+                return ''
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = str(mm, 'utf-8', errors)
+        
+        return self._normalize_newlines(text)
+    
+    @staticmethod
+    def _normalize_newlines(text: str) -> str:
+        """Convert \\r\\n and \\r line endings to \\n (what text-mode reads produce)."""
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+    
+    @staticmethod
+    def _join_lines(lines) -> str:
+        """
+        Concatenate page/paragraph texts, each followed by a newline.
+        
+        Writes into one StringIO buffer, so no intermediate list is built and each
+        page's text can be freed as soon as it has been copied.
+        """
+        buffer = io.StringIO()
+        for line in lines:
+            buffer.write(line)
+            buffer.write("\n")
+        return buffer.getvalue()
+    
+    @staticmethod
+    def _sniff_file_type(data: bytes) -> Optional[str]:
+        """
+        Detect a file type from its leading bytes, so misnamed uploads reach the right parser.
+        
+        Args:
+            data: File content
+        
+        Returns:
+            'pdf', 'docx' or 'xlsx', or None if the content isn't recognized
+        """
+        if data[:4] == b'%PDF':
+            return 'pdf'
+        if data[:2] == b'PK':
+            # Office Open XML is a zip - the member names tell Word from Excel
+            try:
+                with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                    names = archive.namelist()
+            except zipfile.BadZipFile:
+                return None
+            if any(name.startswith('word/') for name in names):
+                return 'docx'
+            if any(name.startswith('xl/') for name in names):
+                return 'xlsx'
+        return None
+    
+    @staticmethod
+    def _as_file(source):
+        """Return something file readers accept: the path itself, or a fresh in-memory stream for bytes."""
+        return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    
+    def _read_csv_rows(self, source, nrows: int):
+        """
+        Read the first rows of a CSV file into a DataFrame.
+        
+        Uses pyarrow's multithreaded C++ reader when installed, streaming record
+        batches only until nrows are available (pandas' pyarrow engine can't
+        stop early); falls back to pandas' own parser.
+        
+        Args:
+            source: Path to CSV file, or its content as bytes
+            nrows: Maximum number of rows to read
+        
+        Returns:
+            pandas DataFrame with at most nrows rows
+        """
+        pd = require_optional_module('pandas')
+        pa = load_optional_module('pyarrow')
+        pa_csv = load_optional_module('pyarrow.csv') if pa is not None else None
+        
+        if pa_csv is not None:
+            try:
+                reader = pa_csv.open_csv(self._as_file(source))
+                batches = []
+                row_count = 0
+                for batch in reader:
+                    batches.append(batch)
+                    row_count += batch.num_rows
+                    if row_count >= nrows:
+                        break
+                return pa.Table.from_batches(batches, schema=reader.schema).to_pandas().head(nrows)
+            except pa.ArrowException:
+                # pyarrow is stricter (ragged rows, odd quoting) - let pandas try
+                pass
+        
+        return pd.read_csv(self._as_file(source), nrows=nrows)
+    
+    def _read_file(self, source, file_type: str = None) -> str:
+        """
+        Read file content based on file type.
+        
+        Args:
+            source: Path to file, or the file content as bytes (uploads are parsed in memory)
+            file_type: File type extension (required for bytes, auto-detected from the path otherwise)
         
         Returns:
             File content as string
         """
+        in_memory = isinstance(source, (bytes, bytearray))
         if not file_type:
-            file_type = file_path.split('.')[-1].lower()
+            file_type = 'txt' if in_memory else source.split('.')[-1].lower()
         
         try:
             if file_type == 'txt':
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return f.read()
+                if in_memory:
+                    return self._normalize_newlines(source.decode('utf-8'))
+                return self._read_text_file(source)
             
             elif file_type == 'pdf':
+                # Prefer a native extractor when installed (PyMuPDF, then pdfium) -
+                # much faster than PyPDF2 on long exam papers
+                pymupdf = load_optional_module('pymupdf')
+                if pymupdf is not None:
+                    doc = pymupdf.open(stream=source, filetype='pdf') if in_memory else pymupdf.open(source)
+                    with doc:
+                        return self._join_lines(page.get_text() for page in doc)
+                
+                pdfium = load_optional_module('pypdfium2')
+                if pdfium is not None:
+                    pdf = pdfium.PdfDocument(source)
+                    try:
+                        return self._join_lines(page.get_textpage().get_text_range() for page in pdf)
+                    finally:
+                        pdf.close()
+                
                 try:
-                    import PyPDF2
-                    with open(file_path, 'rb') as f:
-                        reader = PyPDF2.PdfReader(f)
-                        text = ""
-                        for page in reader.pages:
-                            text += page.extract_text() + "\n"
-                        return text
+                    PyPDF2 = require_optional_module('PyPDF2')
+                    reader = PyPDF2.PdfReader(self._as_file(source))
+                    return self._join_lines(page.extract_text() or "" for page in reader.pages)
                 except ImportError:
                     print("\n" + "="*70)
                     print("❌ Missing dependency: PyPDF2")
@@ -358,10 +1472,10 @@ Generate a Google Form structure based on the exam document above. Return ONLY v
             
             elif file_type in ['docx', 'doc']:
                 try:
-                    from docx import Document
-                    doc = Document(file_path)
-                    text = "\n".join([para.text for para in doc.paragraphs])
-                    return text
+                    docx = require_optional_module('docx')
+                    doc = docx.Document(self._as_file(source))
+                    # Skip the blank spacer paragraphs Word inserts - they only cost prompt tokens
+                    return self._join_lines(para.text for para in doc.paragraphs if para.text.strip())
                 except ImportError:
                     print("\n" + "="*70)
                     print("❌ Missing dependency: python-docx")
@@ -378,9 +1492,27 @@ Generate a Google Form structure based on the exam document above. Return ONLY v
             
             elif file_type in ['csv', 'xlsx', 'xls']:
                 try:
-                    import pandas as pd
-                    df = pd.read_excel(file_path) if file_type in ['xlsx', 'xls'] else pd.read_csv(file_path)
-                    return df.to_string()
+                    pd = require_optional_module('pandas')
+                    # Read one row past the cap to know whether the sheet was truncated
+                    nrows = MAX_SPREADSHEET_ROWS + 1
+                    if file_type == 'xlsx':
+                        # pandas opens openpyxl workbooks read-only, so only the needed rows are loaded
+                        df = pd.read_excel(self._as_file(source), engine='openpyxl', nrows=nrows)
+                    elif file_type == 'xls':
+                        df = pd.read_excel(self._as_file(source), nrows=nrows)
+                    else:
+                        df = self._read_csv_rows(source, nrows)
+                    truncated = len(df) > MAX_SPREADSHEET_ROWS
+                    df = df.head(MAX_SPREADSHEET_ROWS)
+                    
+                    # Compact CSV instead of the padded to_string() table - far fewer prompt tokens
+                    header = (
+                        f"# columns: {list(df.columns)}\n"
+                        f"# dtypes: {df.dtypes.astype(str).to_dict()}\n"
+                    )
+                    if truncated:
+                        header += f"# showing the first {MAX_SPREADSHEET_ROWS} rows\n"
+                    return header + df.to_csv(index=False)
                 except ImportError:
                     print("\n" + "="*70)
                     print("❌ Missing dependency: pandas and/or openpyxl")
@@ -397,11 +1529,12 @@ Generate a Google Form structure based on the exam document above. Return ONLY v
             
             else:
                 # Try to read as text
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    return f.read()
+                if in_memory:
+                    return self._normalize_newlines(source.decode('utf-8', errors='ignore'))
+                return self._read_text_file(source, errors='ignore')
                     
         except FileNotFoundError:
-            raise FileNotFoundError(f"File not found: {file_path}")
+            raise FileNotFoundError(f"File not found: {source}")
         except Exception as e:
             raise Exception(f"Error reading file: {e}")
     
@@ -416,14 +1549,21 @@ Generate a Google Form structure based on the exam document above. Return ONLY v
             Cleaned JSON string
         """
         # Remove markdown code blocks
-        response = re.sub(r'```json\s*', '', response)
-        response = re.sub(r'```\s*', '', response)
+        response = MARKDOWN_FENCE_PATTERN.sub('', response)
         
         # Find JSON object in response
-        # Try to extract JSON between { and }
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if json_match:
-            response = json_match.group(0)
+        # Take the first balanced object, so trailing text containing braces is dropped
+        start = response.find('{')
+        if start != -1:
+            end = JsonObjectScanner().feed(response, start)
+            if end != -1:
+                # Already starts with { and ends with } - nothing to strip
+                return response[start:end]
+            
+            # Unbalanced (e.g. truncated) - slice from the first { to the last }
+            end = response.rfind('}')
+            if end > start:
+                return response[start:end + 1]
         
         # Remove leading/trailing whitespace
         response = response.strip()
@@ -443,67 +1583,44 @@ Generate a Google Form structure based on the exam document above. Return ONLY v
         Returns:
             JSON string with control characters properly escaped
         """
+        # Fast path: well-formed model output usually has nothing to escape
+        if not CONTROL_CHAR_PATTERN.search(json_str):
+            return json_str
+        
         result = []
-        i = 0
+        pos = 0
         in_string = False
-        escape_next = False
         
-        while i < len(json_str):
-            char = json_str[i]
+        while True:
+            # Jump straight to the next quote, backslash or run of control characters,
+            # copying the clean span before it in one slice
+            match = JSON_SPECIAL_CHAR_PATTERN.search(json_str, pos)
+            if match is None:
+                result.append(json_str[pos:])
+                break
             
-            if escape_next:
-                # Next character is escaped, so copy it as-is
-                result.append(char)
-                escape_next = False
-                i += 1
-                continue
+            i = match.start()
+            char = json_str[i]
+            result.append(json_str[pos:i])
+            pos = match.end()
             
             if char == '\\':
-                # Escape character - next char should be preserved
-                result.append(char)
-                escape_next = True
-                i += 1
+                # Escape sequence - copy the backslash and the escaped char as-is
+                result.append(json_str[i:i + 2])
+                pos = i + 2
                 continue
             
             if char == '"':
-                # Check if this quote is escaped (odd number of backslashes before it)
-                backslash_count = 0
-                j = i - 1
-                while j >= 0 and json_str[j] == '\\':
-                    backslash_count += 1
-                    j -= 1
-                
-                if backslash_count % 2 == 0:
-                    # Not escaped, so it's a real quote - toggle string state
-                    in_string = not in_string
-                
+                # Escaped quotes were already consumed above, so any quote
+                # reaching here is a real one - toggle string state
+                in_string = not in_string
                 result.append(char)
-                i += 1
-                continue
-            
-            if in_string:
-                # We're inside a string, escape control characters
-                if ord(char) < 32:  # Control character (0x00-0x1F)
-                    if char == '\n':
-                        result.append('\\n')
-                    elif char == '\r':
-                        result.append('\\r')
-                    elif char == '\t':
-                        result.append('\\t')
-                    elif char == '\b':
-                        result.append('\\b')
-                    elif char == '\f':
-                        result.append('\\f')
-                    else:
-                        # Other control characters
-                        result.append(f'\\u{ord(char):04x}')
-                else:
-                    result.append(char)
+            elif in_string:
+                # We're inside a string, escape the whole run of control characters at once
+                result.append(match.group().translate(CONTROL_CHAR_TRANSLATION))
             else:
                 # Outside string, copy as-is
-                result.append(char)
-            
-            i += 1
+                result.append(match.group())
         
         return ''.join(result)
     
@@ -518,23 +1635,26 @@ Generate a Google Form structure based on the exam document above. Return ONLY v
         Returns:
             Dictionary containing form structure
         """
-        import tempfile
-        import os
+        # Determine file type from the content, falling back to the extension
+        file_type = self._sniff_file_type(file_content)
+        if file_type is None:
+            file_type = filename.split('.')[-1].lower() if '.' in filename else 'txt'
         
-        # Determine file type
-        file_type = filename.split('.')[-1].lower() if '.' in filename else 'txt'
+        # Identical uploads (same bytes) skip parsing and the Gemini call
+        cache_key = None
+        if self.cache:
+            content_hash = hashlib.blake2b(file_content, digest_size=32).hexdigest()
+            cache_key = self.cache.make_key('file', self.model_name, self.system_prompt, file_type, content_hash)
+            cached = self._get_cached_structure(cache_key)
+            if cached is not None:
+                return cached
         
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{file_type}') as tmp_file:
-            tmp_file.write(file_content)
-            tmp_path = tmp_file.name
+        # Parse straight from memory - no temp file round trip
+        content = self._read_file(file_content, file_type)
+        form_structure = self.generate_from_text(content)
         
-        try:
-            # Generate form
-            form_structure = self.generate_from_file(tmp_path, file_type)
-            return form_structure
-        finally:
-            # Clean up temp file
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+        if cache_key:
+            self._set_cached_structure(cache_key, form_structure)
+        
+        return form_structure
 
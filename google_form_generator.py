@@ -4,15 +4,37 @@ Cross-platform compatible (Windows, macOS, Linux)
 """
 
 import os
+import re
 import json
-import pickle
+import copy
+import time
+import threading
+from types import MappingProxyType
 from typing import List, Dict, Optional, Any
-from google.auth.transport.requests import Request
+import httplib2
+import google_auth_httplib2
 from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
 from googleapiclient.errors import HttpError
 
+# Socket timeout (seconds) for Google API requests
+HTTP_TIMEOUT = 60
+# Google Docs URL formats, tried in order (the /document/d/ form also covers full docs.google.com URLs)
+DOC_ID_PATTERNS = (
+    re.compile(r'/document/d/([a-zA-Z0-9-_]+)'),
+    re.compile(r'id=([a-zA-Z0-9-_]+)'),
+)
+# Path segment preceding the ID in document URLs
+DOC_PATH_PREFIX = '/document/d/'
+# A bare document ID
+DOC_ID_ONLY_PATTERN = re.compile(r'^[a-zA-Z0-9-_]+$')
+# How long get_form() results are reused (seconds) and how many forms are kept
+FORM_CACHE_TTL = 60
+FORM_CACHE_SIZE = 128
+# How long get_generator() reuses an authenticated generator (seconds)
+GENERATOR_CACHE_TTL = 3000
+
 
 class GoogleFormGenerator:
     """Main class for creating and managing Google Forms using Google Forms API."""
@@ -28,13 +50,14 @@ class GoogleFormGenerator:
         'openid'  # Required for userinfo scopes
     ]
     
-    def __init__(self, credentials_file: str = None, token_file: str = 'token.pickle', user_credentials=None):
+    def __init__(self, credentials_file: str = None, token_file: str = 'token.json', user_credentials=None):
         """
         Initialize the Google Form Generator.
         
         Args:
             credentials_file: Path to OAuth 2.0 credentials JSON file (optional, will auto-detect)
-            token_file: Path to store authentication token (optional, for backward compat)
+            token_file: Path to store authentication token as JSON (optional, for backward compat;
+                a legacy pickled token next to it is migrated on first load)
             user_credentials: User's OAuth credentials object (optional, for per-user authentication)
         """
         # Auto-detect credentials file location
@@ -42,11 +65,20 @@ class GoogleFormGenerator:
             credentials_file = self._find_credentials_file()
         
         self.credentials_file = credentials_file
+        # Tokens are stored as JSON; an old "token.pickle" path maps to "token.json"
+        if token_file and token_file.endswith('.pickle'):
+            token_file = token_file[:-len('.pickle')] + '.json'
         self.token_file = token_file
         self.user_credentials = user_credentials
         self.service = None
         self.drive_service = None
         self.docs_service = None
+        # Transport shared by the services, and per-thread ones requests are sent on
+        self._http = None
+        self._thread_local = threading.local()
+        # get_form() results: form_id -> (form data, fetched at)
+        self._form_cache = {}
+        self._form_cache_lock = threading.Lock()
         
         # If user credentials provided, use them directly (for per-user auth)
         if user_credentials:
@@ -165,14 +197,66 @@ class GoogleFormGenerator:
             except Exception as e:
                 print(f"⚠️  Warning: Could not create credentials.json from environment: {e}")
     
+    @staticmethod
+    def _auth_request():
+        """Transport for token refreshes - httplib2, like the API services, so requests isn't imported."""
+        return google_auth_httplib2.Request(httplib2.Http(timeout=HTTP_TIMEOUT))
+    
+    def _legacy_token_file(self) -> str:
+        """Path of the pickled token written by older versions."""
+        return os.path.splitext(self.token_file)[0] + '.pickle'
+    
+    def _load_token(self):
+        """
+        Load stored credentials from the token file.
+        
+        A legacy pickled token is rewritten as JSON on first load and then removed.
+        
+        Returns:
+            Credentials object, or None if no token is stored
+        """
+        # Open directly rather than checking existence first - one filesystem call per file
+        try:
+            # Scopes come from the file itself, so the scope check in _authenticate still applies
+            return Credentials.from_authorized_user_file(self.token_file)
+        except FileNotFoundError:
+            pass
+        
+        import pickle
+        
+        legacy_file = self._legacy_token_file()
+        try:
+            with open(legacy_file, 'rb') as token:
+                creds = pickle.load(token)
+        except FileNotFoundError:
+            return None
+        if self._save_token(creds):
+            os.remove(legacy_file)
+            print(f"✅ Migrated {legacy_file} to {self.token_file}")
+        return creds
+    
+    def _save_token(self, creds) -> bool:
+        """
+        Store credentials in the token file as JSON.
+        
+        Args:
+            creds: Credentials to store
+        
+        Returns:
+            True if the token was written
+        """
+        try:
+            with open(self.token_file, 'w', encoding='utf-8') as token:
+                token.write(creds.to_json())
+            return True
+        except Exception as e:
+            print(f"⚠️  Warning: Could not save token to {self.token_file}: {e}")
+            return False
+    
     def _authenticate(self):
         """Authenticate with Google APIs using OAuth 2.0."""
-        creds = None
-        
         # Load existing token if available
-        if os.path.exists(self.token_file):
-            with open(self.token_file, 'rb') as token:
-                creds = pickle.load(token)
+        creds = self._load_token()
         
         # Check if scopes are sufficient (new scope added for permissions)
         if creds and creds.valid:
@@ -182,30 +266,37 @@ class GoogleFormGenerator:
                 # Token doesn't have the new scope, need to re-authenticate
                 print("\n⚠️  New permissions required. Please re-authenticate.")
                 print("   Deleting old token and requesting new authentication...\n")
-                if os.path.exists(self.token_file):
+                try:
                     os.remove(self.token_file)
+                except FileNotFoundError:
+                    pass
                 creds = None
         
         # If no valid credentials, authenticate
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
                 try:
-                    creds.refresh(Request())
+                    creds.refresh(self._auth_request())
                 except Exception as e:
                     # If refresh fails, re-authenticate
                     creds = None
             
             if not creds:
-                if not os.path.exists(self.credentials_file):
-                    raise FileNotFoundError(
-                        f"Credentials file '{self.credentials_file}' not found. "
-                        "Please download it from Google Cloud Console and place it in the project root."
-                    )
+                # Only needed for first-time login - keeps the oauthlib import chain
+                # out of runs that already have a token
+                from google_auth_oauthlib.flow import InstalledAppFlow
                 
                 try:
                     flow = InstalledAppFlow.from_client_secrets_file(
                         self.credentials_file, self.SCOPES
                     )
+                except FileNotFoundError as e:
+                    raise FileNotFoundError(
+                        f"Credentials file '{self.credentials_file}' not found. "
+                        "Please download it from Google Cloud Console and place it in the project root."
+                    ) from e
+                
+                try:
                     # Try local server first (works for local development)
                     # If that fails (e.g., on headless server), use console flow
                     try:
@@ -293,11 +384,7 @@ class GoogleFormGenerator:
             
             # Save credentials for future use (only if using file-based auth)
             if self.token_file:
-                try:
-                    with open(self.token_file, 'wb') as token:
-                        pickle.dump(creds, token)
-                except Exception as e:
-                    print(f"⚠️  Warning: Could not save token to {self.token_file}: {e}")
+                self._save_token(creds)
         
         # Store credentials for later use
         self.creds = creds
@@ -311,45 +398,43 @@ class GoogleFormGenerator:
         This method NEVER raises exceptions - it's safe to call during initialization.
         """
         # Try to load existing token if available
-        if os.path.exists(self.token_file):
-            try:
-                with open(self.token_file, 'rb') as token:
-                    self.creds = pickle.load(token)
-                
-                # Check if token is valid
-                if self.creds and self.creds.valid:
-                    # Try to build services, but don't fail if it doesn't work
+        try:
+            self.creds = self._load_token()
+            
+            # Check if token is valid
+            if self.creds and self.creds.valid:
+                # Try to build services, but don't fail if it doesn't work
+                try:
+                    self._build_services()
+                    print("✅ Using existing authentication token")
+                    return
+                except Exception as e:
+                    # If building services fails (e.g., on headless server), that's OK
+                    # We'll authenticate when needed
+                    print(f"⚠️  Could not build services with existing token: {e}")
+                    print("   Will authenticate when creating forms.")
+                    self.creds = None
+                    return
+            elif self.creds and self.creds.expired and self.creds.refresh_token:
+                # Try to refresh
+                try:
+                    self.creds.refresh(self._auth_request())
+                    # Try to build services after refresh
                     try:
                         self._build_services()
-                        print("✅ Using existing authentication token")
+                        print("✅ Refreshed authentication token")
                         return
                     except Exception as e:
-                        # If building services fails (e.g., on headless server), that's OK
-                        # We'll authenticate when needed
-                        print(f"⚠️  Could not build services with existing token: {e}")
-                        print("   Will authenticate when creating forms.")
+                        print(f"⚠️  Could not build services after refresh: {e}")
                         self.creds = None
                         return
-                elif self.creds and self.creds.expired and self.creds.refresh_token:
-                    # Try to refresh
-                    try:
-                        self.creds.refresh(Request())
-                        # Try to build services after refresh
-                        try:
-                            self._build_services()
-                            print("✅ Refreshed authentication token")
-                            return
-                        except Exception as e:
-                            print(f"⚠️  Could not build services after refresh: {e}")
-                            self.creds = None
-                            return
-                    except Exception as refresh_error:
-                        print(f"⚠️  Could not refresh token: {refresh_error}")
-                        self.creds = None
-            except Exception as e:
-                # Silently handle any errors - don't prevent app startup
-                print(f"⚠️  Could not load existing token: {e}")
-                self.creds = None
+                except Exception as refresh_error:
+                    print(f"⚠️  Could not refresh token: {refresh_error}")
+                    self.creds = None
+        except Exception as e:
+            # Silently handle any errors - don't prevent app startup
+            print(f"⚠️  Could not load existing token: {e}")
+            self.creds = None
         
         # No valid token - will need to authenticate when needed
         # This is normal on first startup or headless servers
@@ -381,7 +466,7 @@ class GoogleFormGenerator:
                     "OAuth authentication required. "
                     "This is a headless server (Render/Heroku). "
                     "Please use the 'Login with Google' button in the web UI to authenticate, "
-                    "or upload a token.pickle file. "
+                    "or upload a token.json file. "
                     "See FIX_HEADLESS_AUTH.md for instructions."
                 )
             
@@ -401,7 +486,7 @@ class GoogleFormGenerator:
                             f"OAuth authentication failed: {auth_error}. "
                             "This is normal on headless servers like Render. "
                             "Please use the 'Login with Google' button in the web UI to authenticate, "
-                            "or upload a token.pickle file to Render. "
+                            "or upload a token.json file to Render. "
                             "See FIX_HEADLESS_AUTH.md for instructions."
                         ) from auth_error
                     raise
@@ -411,22 +496,55 @@ class GoogleFormGenerator:
         # Refresh token if expired
         if creds.expired and creds.refresh_token:
             try:
-                creds.refresh(Request())
+                creds.refresh(self._auth_request())
             except Exception as e:
                 print(f"⚠️  Warning: Could not refresh token: {e}")
         
-        # Build API services
-        self.service = build('forms', 'v1', credentials=creds)
-        self.drive_service = build('drive', 'v3', credentials=creds)
-        self.docs_service = build('docs', 'v1', credentials=creds)
+        # Build API services on one authorized transport, so they share its
+        # keep-alive connections instead of each opening their own. Requests are sent
+        # on a per-thread copy of it (see _build_request), since one generator may
+        # serve several request threads.
+        # Discovery documents come from the installed client library (no HTTP fetch,
+        # no file_cache lookup)
+        http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+        self._http = http
+        discovery_options = {
+            'http': http,
+            'requestBuilder': self._build_request,
+            'static_discovery': True,
+            'cache_discovery': False
+        }
+        self.service = build('forms', 'v1', **discovery_options)
+        self.drive_service = build('drive', 'v3', **discovery_options)
+        self.docs_service = build('docs', 'v1', **discovery_options)
     
-    def create_form(self, title: str, description: str = None) -> 'Form':
+    def _thread_http(self):
+        """
+        Authorized transport for API calls made on the current thread.
+        
+        httplib2 connections aren't thread-safe, so each thread gets its own
+        transport for the current credentials, shared by all three services.
+        """
+        local = self._thread_local
+        if getattr(local, 'owner', None) is not self._http:
+            local.owner = self._http
+            local.http = google_auth_httplib2.AuthorizedHttp(
+                self._http.credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT)
+            )
+        return local.http
+    
+    def _build_request(self, http, *args, **kwargs) -> HttpRequest:
+        """Request factory for the API services: sends on the calling thread's transport."""
+        return HttpRequest(self._thread_http(), *args, **kwargs)
+    
+    def create_form(self, title: str, description: str = None, public: bool = False) -> 'Form':
         """
         Create a new Google Form.
         
         Args:
             title: Form title
             description: Form description (optional)
+            public: Let anyone with the link view the form file in Drive (one extra API call)
         
         Returns:
             Form object for adding questions
@@ -441,7 +559,7 @@ class GoogleFormGenerator:
                     raise RuntimeError(
                         "Google OAuth authentication is required to create forms. "
                         "Please use the 'Login with Google' button in the web UI to authenticate, "
-                        "or upload a token.pickle file. "
+                        "or upload a token.json file. "
                         "See FIX_HEADLESS_AUTH.md for instructions."
                     ) from e
                 raise
@@ -453,8 +571,10 @@ class GoogleFormGenerator:
         }
         
         try:
+            # Only the new file's ID is used
             form = self.drive_service.files().create(
-                body=form_metadata
+                body=form_metadata,
+                fields='id'
             ).execute()
             
             form_id = form.get('id')
@@ -462,16 +582,18 @@ class GoogleFormGenerator:
             if not form_id:
                 raise ValueError("Failed to create form: No form ID returned")
             
-            # Set permissions to make form accessible
-            # Allow anyone with the link to view the form
-            self._set_form_permissions(form_id)
+            if public:
+                self._set_form_permissions(form_id)
+            
+            form = Form(self.service, form_id, title, description, form_cache=self._form_cache)
             
             # Update form with description if provided
-            # (Title is already set via Drive API, but we update it via Forms API for consistency)
+            # (Title is already set via Drive API, but we update it via Forms API for consistency).
+            # Queued, so it goes out in the same batchUpdate as the questions
             if description:
-                self.update_form_info(form_id, title, description)
+                form.update_info(title, description)
             
-            return Form(self.service, form_id, title, description)
+            return form
             
         except HttpError as error:
             error_content = str(error.content).lower() if error.content else ""
@@ -533,7 +655,8 @@ class GoogleFormGenerator:
             
             self.drive_service.permissions().create(
                 fileId=form_id,
-                body=permission
+                body=permission,
+                fields='id'
             ).execute()
             
         except HttpError as error:
@@ -546,45 +669,49 @@ class GoogleFormGenerator:
     
     def update_form_info(self, form_id: str, title: str, description: str = None):
         """Update form title and description."""
-        update_request = {
-            'requests': [
-                {
-                    'updateFormInfo': {
-                        'info': {
-                            'title': title
-                        },
-                        'updateMask': 'title'
-                    }
-                }
-            ]
-        }
-        
-        if description:
-            update_request['requests'][0]['updateFormInfo']['info']['description'] = description
-            update_request['requests'][0]['updateFormInfo']['updateMask'] = 'title,description'
+        update_request = {'requests': [Form.info_request(title, description)]}
         
         try:
             self.service.forms().batchUpdate(formId=form_id, body=update_request).execute()
         except HttpError as error:
             print(f"An error occurred while updating form info: {error}")
             raise
+        self._form_cache.pop(form_id, None)
     
-    def get_form(self, form_id: str) -> Dict[str, Any]:
+    def get_form(self, form_id: str, fresh: bool = False) -> Dict[str, Any]:
         """
         Retrieve an existing form.
         
+        Results are reused for FORM_CACHE_TTL seconds; changes made through this
+        generator (update_form_info, Form.commit) drop the cached copy.
+        
         Args:
             form_id: Google Form ID
+            fresh: Skip the cache and fetch the form from the API
         
         Returns:
             Form data as dictionary
         """
+        now = time.monotonic()
+        if not fresh:
+            entry = self._form_cache.get(form_id)
+            if entry is not None and now - entry[1] < FORM_CACHE_TTL:
+                # Copy, so callers can't modify the cached form
+                return copy.deepcopy(entry[0])
+        
         try:
             form = self.service.forms().get(formId=form_id).execute()
-            return form
         except HttpError as error:
             print(f"An error occurred while retrieving form: {error}")
             raise
+        
+        with self._form_cache_lock:
+            self._form_cache.pop(form_id, None)
+            if len(self._form_cache) >= FORM_CACHE_SIZE:
+                # Evict the oldest entry (dicts keep insertion order)
+                self._form_cache.pop(next(iter(self._form_cache)))
+            self._form_cache[form_id] = (copy.deepcopy(form), now)
+        return form
     
     def get_form_url(self, form_id: str) -> str:
         """
@@ -608,22 +735,27 @@ class GoogleFormGenerator:
         Returns:
             Document ID
         """
-        import re
-        
-        # Patterns for different Google Docs URL formats
-        patterns = [
-            r'/document/d/([a-zA-Z0-9-_]+)',
-            r'id=([a-zA-Z0-9-_]+)',
-            r'docs\.google\.com/document/d/([a-zA-Z0-9-_]+)',
-        ]
+        # Common case: .../document/d/<id>[/?#...] - slice it out without the regex engine
+        start = url.find(DOC_PATH_PREFIX)
+        if start != -1:
+            start += len(DOC_PATH_PREFIX)
+            end = len(url)
+            for separator in '/?#':
+                position = url.find(separator, start, end)
+                if position != -1:
+                    end = position
+            doc_id = url[start:end]
+            # Accept it only if it's entirely ID characters, i.e. what the pattern would capture
+            if doc_id.isascii() and doc_id.replace('-', '').replace('_', '').isalnum():
+                return doc_id
         
-        for pattern in patterns:
-            match = re.search(pattern, url)
+        for pattern in DOC_ID_PATTERNS:
+            match = pattern.search(url)
             if match:
                 return match.group(1)
         
         # If no pattern matches, assume it's already a document ID
-        if re.match(r'^[a-zA-Z0-9-_]+$', url):
+        if DOC_ID_ONLY_PATTERN.match(url):
             return url
         
         raise ValueError(f"Could not extract document ID from URL: {url}")
@@ -649,7 +781,7 @@ class GoogleFormGenerator:
                         raise RuntimeError(
                             "Google OAuth authentication is required to read Google Docs. "
                             "Please use the 'Login with Google' button in the web UI to authenticate, "
-                            "or upload a token.pickle file. "
+                            "or upload a token.json file. "
                             "See FIX_HEADLESS_AUTH.md for instructions."
                         ) from e
                     raise
@@ -664,20 +796,19 @@ class GoogleFormGenerator:
             if not self.docs_service:
                 raise RuntimeError("Google Docs service is not initialized. Please authenticate first.")
             
-            doc = self.docs_service.documents().get(documentId=doc_id).execute()
-            
-            # Extract text from document
-            content = []
-            if 'body' in doc and 'content' in doc['body']:
-                for element in doc['body']['content']:
-                    if 'paragraph' in element:
-                        para = element['paragraph']
-                        if 'elements' in para:
-                            for elem in para['elements']:
-                                if 'textRun' in elem:
-                                    content.append(elem['textRun'].get('content', ''))
+            # Only the text runs are needed - skip styles, lists and other metadata in the response
+            doc = self.docs_service.documents().get(
+                documentId=doc_id,
+                fields='body/content/paragraph/elements/textRun/content'
+            ).execute()
             
-            text_content = ''.join(content).strip()
+            # Extract text from document in one pass
+            text_content = ''.join(
+                elem['textRun'].get('content', '')
+                for element in doc.get('body', {}).get('content', ())
+                for elem in element.get('paragraph', {}).get('elements', ())
+                if 'textRun' in elem
+            ).strip()
             
             if not text_content:
                 raise ValueError("Document appears to be empty or could not be read")
@@ -703,19 +834,106 @@ class GoogleFormGenerator:
         """
         Finalize and save a form, returning its URL.
         
+        Sends any questions still queued on the form in one batchUpdate call.
+        
         Args:
             form: Form object to save
         
         Returns:
             Form URL
         """
+        form.commit()
         return form.get_url()
 
 
+# Builders for the type-specific part of a question, keyed by add_question() type.
+# Each takes add_question()'s type-related arguments and returns the one *Question field.
+
+def _text_question(**_) -> Dict[str, Any]:
+    return {'textQuestion': {}}
+
+
+def _choice_question(question_type: str, options: List[str], **_) -> Dict[str, Any]:
+    if not options:
+        raise ValueError(f"Options are required for {question_type} questions")
+    return {
+        'choiceQuestion': {
+            'type': Form.TYPE_MAPPING[question_type],
+            'options': [{'value': option} for option in options]
+        }
+    }
+
+
+def _scale_question(scale_min: int, scale_max: int, scale_min_label: str, scale_max_label: str, **_) -> Dict[str, Any]:
+    scale_question = {
+        'low': scale_min,
+        'high': scale_max
+    }
+    if scale_min_label:
+        scale_question['lowLabel'] = scale_min_label
+    if scale_max_label:
+        scale_question['highLabel'] = scale_max_label
+    return {'scaleQuestion': scale_question}
+
+
+def _date_question(**_) -> Dict[str, Any]:
+    return {
+        'dateQuestion': {
+            'includeTime': False,
+            'includeYear': True
+        }
+    }
+
+
+def _time_question(**_) -> Dict[str, Any]:
+    return {'timeQuestion': {}}
+
+
+def _file_question(**_) -> Dict[str, Any]:
+    return {
+        'fileUploadQuestion': {
+            'maxFileSize': '10MB',
+            'maxFiles': 1
+        }
+    }
+
+
+QUESTION_BUILDERS = MappingProxyType({
+    'text': _text_question,
+    'paragraph': _text_question,
+    'choice': _choice_question,
+    'checkbox': _choice_question,
+    'dropdown': _choice_question,
+    'scale': _scale_question,
+    'date': _date_question,
+    'time': _time_question,
+    'file': _file_question
+})
+
+
 class Form:
-    """Represents a Google Form with methods to add questions."""
+    """
+    Represents a Google Form with methods to add questions.
     
-    def __init__(self, service, form_id: str, title: str, description: str = None):
+    Questions are queued locally and sent together by commit() (called by
+    GoogleFormGenerator.save_form()), so a form costs one API round trip
+    instead of one per question.
+    """
+    
+    # Question types accepted by add_question(), mapped to Google Forms API question types
+    TYPE_MAPPING = MappingProxyType({
+        'text': 'SHORT_ANSWER',
+        'paragraph': 'PARAGRAPH_TEXT',
+        'choice': 'RADIO',
+        'checkbox': 'CHECKBOX',
+        'dropdown': 'DROP_DOWN',
+        'scale': 'SCALE',
+        'date': 'DATE',
+        'time': 'TIME',
+        'file': 'FILE_UPLOAD'
+    })
+    
+    def __init__(self, service, form_id: str, title: str, description: str = None, form_cache: dict = None):
         """
         Initialize a Form object.
         
@@ -724,12 +942,58 @@ class Form:
             form_id: Google Form ID
             title: Form title
             description: Form description
+            form_cache: The creating generator's get_form() cache, invalidated on commit (optional)
         """
         self.service = service
         self.form_id = form_id
         self.title = title
         self.description = description
         self.questions = []
+        self._form_cache = form_cache
+        # Queued createItem requests and their question info, sent by commit()
+        self._pending_requests = []
+        self._pending_questions = []
+        # Queued updateFormInfo request, sent ahead of the questions by commit()
+        self._pending_info = None
+    
+    @staticmethod
+    def info_request(title: str, description: str = None) -> Dict[str, Any]:
+        """
+        Build an updateFormInfo request for a form's title and description.
+        
+        Args:
+            title: Form title
+            description: Form description (optional, left unchanged if empty)
+        
+        Returns:
+            updateFormInfo request
+        """
+        if description:
+            return {
+                'updateFormInfo': {
+                    'info': {'title': title, 'description': description},
+                    'updateMask': 'title,description'
+                }
+            }
+        return {
+            'updateFormInfo': {
+                'info': {'title': title},
+                'updateMask': 'title'
+            }
+        }
+    
+    def update_info(self, title: str, description: str = None):
+        """
+        Queue a title/description update, sent by commit() together with the queued questions.
+        
+        Args:
+            title: Form title
+            description: Form description (optional)
+        """
+        self.title = title
+        if description:
+            self.description = description
+        self._pending_info = self.info_request(title, description)
     
     def add_question(
         self,
@@ -743,7 +1007,7 @@ class Form:
         scale_max_label: str = None
     ) -> Dict[str, Any]:
         """
-        Add a question to the form.
+        Queue a question to be added to the form by commit().
         
         Args:
             question_text: The question text
@@ -756,115 +1020,131 @@ class Form:
             scale_max_label: Label for maximum scale value
         
         Returns:
-            Created question data
-        """
-        # Map question types to Google Forms API question types
-        type_mapping = {
-            'text': 'SHORT_ANSWER',
-            'paragraph': 'PARAGRAPH_TEXT',
-            'choice': 'RADIO',
-            'checkbox': 'CHECKBOX',
-            'dropdown': 'DROP_DOWN',
-            'scale': 'SCALE',
-            'date': 'DATE',
-            'time': 'TIME',
-            'file': 'FILE_UPLOAD'
-        }
-        
-        if question_type not in type_mapping:
+            Queued createItem request
+        """
+        if question_type not in self.TYPE_MAPPING:
             raise ValueError(
                 f"Invalid question type: {question_type}. "
-                f"Valid types: {', '.join(type_mapping.keys())}"
+                f"Valid types: {', '.join(self.TYPE_MAPPING.keys())}"
             )
         
-        google_type = type_mapping[question_type]
+        # Configure question based on type - only the one matching *Question field is set
+        question = {'required': required}
+        question.update(QUESTION_BUILDERS[question_type](
+            question_type=question_type,
+            options=options,
+            scale_min=scale_min,
+            scale_max=scale_max,
+            scale_min_label=scale_min_label,
+            scale_max_label=scale_max_label
+        ))
+        
+        question_request = self._new_question_request(question_text, question)
+        
+        # Queue the question - commit() submits the whole batch
+        self._pending_requests.append(question_request)
+        self._pending_questions.append({
+            'text': question_text,
+            'type': question_type,
+            'required': required
+        })
+        
+        return question_request
+    
+    def _new_question_request(self, question_text: str, question: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build a createItem request placing a question after everything added or queued so far.
+        
+        Args:
+            question_text: The question text
+            question: Google Forms API question body
         
-        # Build question request
-        question_request = {
+        Returns:
+            createItem request
+        """
+        return {
             'createItem': {
                 'item': {
                     'title': question_text,
-                    'questionItem': {
-                        'question': {
-                            'required': required,
-                            'choiceQuestion': None,
-                            'textQuestion': None,
-                            'scaleQuestion': None,
-                            'dateQuestion': None,
-                            'timeQuestion': None,
-                            'fileUploadQuestion': None
-                        }
-                    }
+                    'questionItem': {'question': question}
                 },
                 'location': {
-                    'index': len(self.questions)
+                    'index': len(self.questions) + len(self._pending_requests)
                 }
             }
         }
+    
+    def commit(self) -> Optional[Dict[str, Any]]:
+        """
+        Send the queued form info update and questions to Google Forms in a single batchUpdate call.
         
-        # Configure question based on type
-        if question_type in ['text', 'paragraph']:
-            question_request['createItem']['item']['questionItem']['question']['textQuestion'] = {}
-        
-        elif question_type in ['choice', 'checkbox', 'dropdown']:
-            if not options:
-                raise ValueError(f"Options are required for {question_type} questions")
-            
-            choice_question = {
-                'type': 'RADIO' if question_type == 'choice' else ('CHECKBOX' if question_type == 'checkbox' else 'DROP_DOWN'),
-                'options': [{'value': option} for option in options]
-            }
-            
-            question_request['createItem']['item']['questionItem']['question']['choiceQuestion'] = choice_question
-        
-        elif question_type == 'scale':
-            scale_question = {
-                'low': scale_min,
-                'high': scale_max
-            }
-            if scale_min_label:
-                scale_question['lowLabel'] = scale_min_label
-            if scale_max_label:
-                scale_question['highLabel'] = scale_max_label
-            
-            question_request['createItem']['item']['questionItem']['question']['scaleQuestion'] = scale_question
+        If the API rejects the batch (e.g. one invalid question), the requests are
+        retried one at a time so the valid ones are still applied.
         
-        elif question_type == 'date':
-            question_request['createItem']['item']['questionItem']['question']['dateQuestion'] = {
-                'includeTime': False,
-                'includeYear': True
-            }
+        Returns:
+            batchUpdate response, or None if nothing was queued
+        """
+        if not self._pending_requests and self._pending_info is None:
+            return None
         
-        elif question_type == 'time':
-            question_request['createItem']['item']['questionItem']['question']['timeQuestion'] = {}
+        requests, questions, info = self._pending_requests, self._pending_questions, self._pending_info
+        if self._form_cache is not None:
+            self._form_cache.pop(self.form_id, None)
         
-        elif question_type == 'file':
-            question_request['createItem']['item']['questionItem']['question']['fileUploadQuestion'] = {
-                'maxFileSize': '10MB',
-                'maxFiles': 1
-            }
-        
-        # Submit the question
+        # The queue is only cleared once the API has taken the batch, so any other
+        # failure (server error, timeout, TLS or token refresh error) leaves everything
+        # queued for another save_form() attempt
         try:
-            batch_update_request = {'requests': [question_request]}
             response = self.service.forms().batchUpdate(
                 formId=self.form_id,
-                body=batch_update_request
+                body={'requests': ([info] if info else []) + requests}
             ).execute()
+        except HttpError as error:
+            if error.resp.status != 400:
+                print(f"An error occurred while adding questions: {error}")
+                raise
             
-            # Store question info
-            question_data = {
-                'text': question_text,
-                'type': question_type,
-                'required': required
-            }
-            self.questions.append(question_data)
-            
-            return response
+            self._pending_requests, self._pending_questions, self._pending_info = [], [], None
+            print(f"⚠️  Batch of {len(requests)} questions rejected, adding them one at a time: {error}")
+            if info:
+                try:
+                    self.service.forms().batchUpdate(formId=self.form_id, body={'requests': [info]}).execute()
+                except HttpError as info_error:
+                    print(f"⚠️  Could not update form info: {info_error}")
+            return self._commit_individually(requests, questions)
+        
+        self._pending_requests, self._pending_questions, self._pending_info = [], [], None
+        self.questions.extend(questions)
+        return response
+    
+    def _commit_individually(self, requests: List[Dict[str, Any]], questions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Submit queued questions one batchUpdate call each, skipping the ones the API rejects.
+        
+        Args:
+            requests: createItem requests
+            questions: Question info matching each request
+        
+        Returns:
+            Combined replies of the successful calls
+        """
+        replies = []
+        for question_request, question_data in zip(requests, questions):
+            # Earlier questions may have been skipped, so place each one after the last added
+            question_request['createItem']['location']['index'] = len(self.questions)
+            try:
+                response = self.service.forms().batchUpdate(
+                    formId=self.form_id,
+                    body={'requests': [question_request]}
+                ).execute()
+            except HttpError as error:
+                print(f"⚠️  Could not add question '{question_data['text'][:50]}': {error}")
+                continue
             
-        except HttpError as error:
-            print(f"An error occurred while adding question: {error}")
-            raise
+            replies.extend(response.get('replies', []))
+            self.questions.append(question_data)
+        
+        return {'replies': replies}
     
     def get_url(self) -> str:
         """Get the URL of this form."""
@@ -875,6 +1155,37 @@ class Form:
         return f"https://docs.google.com/forms/d/{self.form_id}/edit"
 
 
+# Authenticated generators shared within a process, keyed by (credentials_file, token_file)
+_generator_cache = {}
+_generator_cache_lock = threading.Lock()
+
+
+def get_generator(credentials_file: str = None, token_file: str = 'token.json') -> GoogleFormGenerator:
+    """
+    Return a GoogleFormGenerator for the given credential files, reusing a cached one.
+    
+    Token loading and the three service builds then happen once per process (per
+    GENERATOR_CACHE_TTL) instead of on every construction.
+    
+    Args:
+        credentials_file: Path to OAuth 2.0 credentials JSON file (optional, will auto-detect)
+        token_file: Path to the stored authentication token
+    
+    Returns:
+        GoogleFormGenerator instance
+    """
+    key = (credentials_file, token_file)
+    now = time.monotonic()
+    with _generator_cache_lock:
+        entry = _generator_cache.get(key)
+        if entry is not None and now - entry[1] < GENERATOR_CACHE_TTL:
+            return entry[0]
+        
+        generator = GoogleFormGenerator(credentials_file=credentials_file, token_file=token_file)
+        _generator_cache[key] = (generator, now)
+        return generator
+
+
 # Example usage
 if __name__ == '__main__':
     # Initialize the generator
@@ -908,8 +1219,8 @@ if __name__ == '__main__':
         options=["Red", "Blue", "Green", "Yellow"]
     )
     
-    # Get the form URL
-    form_url = form.get_url()
+    # Send the queued questions and get the form URL
+    form_url = generator.save_form(form)
     print(f"Form created successfully!")
     print(f"View form: {form_url}")
     print(f"Edit form: {form.get_edit_url()}")
@@ -2,7 +2,6 @@
 Gunicorn configuration for production deployment
 """
 
-import multiprocessing
 import os
 
 # Server socket
@@ -13,10 +12,14 @@ print(f"🌐 Gunicorn binding to: {bind} (PORT env var: {os.getenv('PORT', 'not
 backlog = 2048
 
 # Worker processes - optimized for free tier (lightweight)
-# Use fewer workers for free tier platforms
-cpu_count = multiprocessing.cpu_count()
-workers = min(cpu_count * 2 + 1, 2)  # Max 2 workers for free tier
-worker_class = 'sync'
+# Requests mostly wait on Google APIs, so one process serving them on several threads
+# handles more concurrent form creations than extra sync workers, each of which holds
+# its own copy of the app in memory. Set WEB_CONCURRENCY to add processes.
+# (No preload_app: app.py starts its log listener thread at import, which wouldn't
+# survive the fork, and each worker needs its own Google API connections anyway)
+workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
 worker_connections = 1000
 timeout = 120
 keepalive = 5
@@ -44,3 +47,12 @@ tmp_upload_dir = None
 # keyfile = None
 # certfile = None
 
+
+def post_fork(server, worker):
+    """Load the Google token and build API services before the worker takes traffic."""
+    try:
+        from google_form_generator import get_generator
+        get_generator()
+    except Exception as e:
+        # Authentication can still happen later via the web UI
+        print(f"⚠️  Could not warm Google Forms client in worker {worker.pid}: {e}")
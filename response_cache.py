@@ -0,0 +1,144 @@
+"""
+Persistent response cache for AI form generation
+Stores generated form structures in SQLite so repeated documents skip the Gemini API call
+"""
+
+import os
+import re
+import time
+import zlib
+import unicodedata
+import sqlite3
+import hashlib
+import functools
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+
+class ResponseCache:
+    """SQLite-backed key-value cache for generated form structures."""
+
+    def __init__(self, db_path: str = None, ttl_days: float = 7):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            db_path: Path to SQLite file (optional, defaults to GEMINI_CACHE_PATH or the system temp dir)
+            ttl_days: Days before an entry expires (None or 0 keeps entries forever)
+        """
+        if db_path is None:
+            db_path = os.getenv('GEMINI_CACHE_PATH') or os.path.join(
+                tempfile.gettempdir(), 'gemini_form_cache.sqlite3'
+            )
+
+        self.db_path = db_path
+        self.ttl_seconds = ttl_days * 86400 if ttl_days else None
+        # One connection shared by the web app's worker threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at INTEGER NOT NULL)'
+            )
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """
+        Normalize text for cache keys so trivially different copies of a document share one entry.
+        
+        Applies Unicode NFC (composed vs decomposed accents from different editors) and collapses whitespace.
+        """
+        return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Build a cache key from the given parts (model name, prompt, content, ...)."""
+        # Keys only need to be collision-resistant, not a security boundary
+        return hashlib.blake2b('\0'.join(parts).encode('utf-8'), digest_size=32, usedforsecurity=False).hexdigest()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def text_key(*parts: str) -> str:
+        """
+        Build a cache key whose last part is document text, normalized first.
+
+        Memoized, so resubmitting the same text in one process ("regenerate") skips
+        re-normalizing and re-hashing a possibly very long document.
+        """
+        *prefix, text = parts
+        return ResponseCache.make_key(*prefix, ResponseCache.normalize_text(text))
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Cached string, or None on a miss or expired entry
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, created_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds and time.time() - created_at > self.ttl_seconds:
+                with self._conn:
+                    self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                return None
+
+        return zlib.decompress(value).decode('utf-8')
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """
+        Look up several cached values with one query per batch of keys.
+
+        Args:
+            keys: Cache keys from make_key()
+
+        Returns:
+            Dictionary of key -> cached string for the keys that hit (expired entries are dropped)
+        """
+        rows = []
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ', '.join('?' * len(batch))
+                rows.extend(self._conn.execute(
+                    f'SELECT key, value, created_at FROM responses WHERE key IN ({placeholders})', batch
+                ).fetchall())
+
+            now = time.time()
+            expired = [key for key, _, created_at in rows
+                       if self.ttl_seconds and now - created_at > self.ttl_seconds]
+            if expired:
+                with self._conn:
+                    self._conn.executemany('DELETE FROM responses WHERE key = ?', [(key,) for key in expired])
+
+        expired = set(expired)
+        return {
+            key: zlib.decompress(value).decode('utf-8')
+            for key, value, _ in rows if key not in expired
+        }
+
+    def set(self, key: str, value: str):
+        """
+        Store a value (compressed) under the given key.
+
+        Args:
+            key: Cache key from make_key()
+            value: String to cache
+        """
+        blob = zlib.compress(value.encode('utf-8'))
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)',
+                (key, blob, int(time.time()))
+            )
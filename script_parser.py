@@ -4,22 +4,83 @@ Parses Google Apps Script code to extract form structure.
 """
 
 import re
+import sys
+import copy
+import json
+import functools
 from typing import Dict, List, Any, Optional
 
+try:
+    import re2
+except ImportError:
+    # google-re2 not installed, whole-script patterns use re
+    re2 = None
+
+# Engine for the patterns that run over the whole (user-supplied) script. re2 matches in
+# linear time, while re can take quadratic time on e.g. thousands of unterminated
+# ".setDescription('" calls. Per-block patterns stay on re, which is faster on short strings.
+SCRIPT_REGEX = re2 or re
+
+# JavaScript line and block comments, whichever starts first
+COMMENT_PATTERN = SCRIPT_REGEX.compile(r'(?s)//[^\n]*|/\*.*?\*/')
+# FormApp.create('Title') and form.setDescription('...')
+FORM_TITLE_PATTERN = SCRIPT_REGEX.compile(r'FormApp\.create\(["\'](.*?)["\']\)')
+FORM_DESCRIPTION_PATTERN = SCRIPT_REGEX.compile(r'(?s)\.setDescription\(["\'](.*?)["\']\)')
+# form.add*Item() followed by method chains
+QUESTION_BLOCK_PATTERN = re.compile(r'form\.(add\w+Item\(\)(?:\s*\.[^;]*)*)', re.DOTALL)
+# Item kind of a question block, mapped to our question type (None = not a question)
+ITEM_PATTERN = re.compile(r'add(\w+)Item\(\)')
+ITEM_TYPES = {
+    'Text': 'text',
+    'MultipleChoice': 'choice',
+    'List': 'dropdown',
+    'Checkbox': 'checkbox',
+    'Scale': 'linear_scale',
+    'LinearScale': 'linear_scale',
+    # Page breaks and section headers are not questions
+    'PageBreak': None,
+    'SectionHeader': None,
+}
+# Question types that take a list of options
+CHOICE_TYPES = frozenset({'choice', 'dropdown', 'checkbox'})
+# A '...' or "..." string literal argument (escapes allowed, no raw newlines), written
+# unrolled so a malformed call fails at the end of its line without backtracking.
+# The text lands in group 1 or 2 depending on the quote, i.e. match.lastindex
+STRING_ARG = r'''(?:'([^'\\\n]*(?:\\[\s\S][^'\\\n]*)*)'|"([^"\\\n]*(?:\\[\s\S][^"\\\n]*)*)")'''
+# Chained setters inside a question block
+TITLE_PATTERN = re.compile(r'\.setTitle\(' + STRING_ARG + r'\)')
+REQUIRED_CALL = '.setRequired('
+HELP_TEXT_PATTERN = re.compile(r'\.setHelpText\(' + STRING_ARG + r'\)')
+CHOICE_VALUES_CALL = '.setChoiceValues('
+BOUNDS_CALL = '.setBounds('
+LABELS_PATTERN = re.compile(r'\.setLabels\(["\'](.*?)["\']\s*,\s*["\'](.*?)["\']\)')
+# A backslash escape inside a JavaScript string literal
+ESCAPE_PATTERN = re.compile(r'\\(.)', re.DOTALL)
+ESCAPE_CHARS = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', "'": "'", '\\': '\\'}
+# Scripts longer than this are parsed every time rather than kept in the result cache
+PARSE_CACHE_MAX_CHARS = 200_000
+
+
+def unescape_string(text: str) -> str:
+    """
+    Resolve JavaScript escape sequences (\\n, \\t, \\r, \\", \\', \\\\) in one pass.
+    
+    Unknown escapes are kept as written.
+    """
+    if '\\' not in text:
+        return text
+    return ESCAPE_PATTERN.sub(lambda m: ESCAPE_CHARS.get(m.group(1), m.group(0)), text)
+
 
 class ScriptParser:
     """Parser for Google Apps Script form creation code."""
     
-    def __init__(self):
-        self.form_title = None
-        self.form_description = None
-        self.questions = []
-        self.current_section = None
-        
     def parse_script(self, script_code: str) -> Dict[str, Any]:
         """
         Parse Google Apps Script code and extract form structure.
         
+        The parser keeps no state between calls, so one instance can be shared by threads.
+        
         Args:
             script_code: Google Apps Script code as string
         
@@ -30,33 +91,30 @@ class ScriptParser:
         script_code = self._remove_comments(script_code)
         
         # Extract form title
-        self.form_title = self._extract_form_title(script_code)
+        form_title = self._extract_form_title(script_code)
         
         # Extract form description
-        self.form_description = self._extract_form_description(script_code)
+        form_description = self._extract_form_description(script_code)
         
         # Extract questions
-        self.questions = self._extract_questions(script_code)
+        questions = self._extract_questions(script_code)
         
         return {
-            'title': self.form_title or 'Form from Script',
-            'description': self.form_description or '',
-            'questions': self.questions
+            'title': form_title or 'Form from Script',
+            'description': form_description or '',
+            'questions': questions
         }
     
     def _remove_comments(self, code: str) -> str:
         """Remove JavaScript comments from code."""
-        # Remove single-line comments
-        code = re.sub(r'//.*?$', '', code, flags=re.MULTILINE)
-        # Remove multi-line comments
-        code = re.sub(r'/\*.*?\*/', '', code, flags=re.DOTALL)
-        return code
+        # One pass for both kinds, so '//' inside a block comment (or '/*' after a
+        # line comment) is treated as part of the comment it appears in
+        return COMMENT_PATTERN.sub('', code)
     
     def _extract_form_title(self, code: str) -> Optional[str]:
         """Extract form title from FormApp.create() call."""
         # Match: FormApp.create('Title') or FormApp.create("Title")
-        # Escape quotes properly in regex
-        match = re.search(r'FormApp\.create\(["\'](.*?)["\']\)', code)
+        match = FORM_TITLE_PATTERN.search(code)
         if match:
             return match.group(1)
         return None
@@ -65,12 +123,11 @@ class ScriptParser:
         """Extract form description from setDescription() call."""
         # Match: form.setDescription('Description') - handle both single and double quotes
         # Also handle multi-line strings
-        match = re.search(r'\.setDescription\(["\'](.*?)["\']\)', code, re.DOTALL)
+        match = FORM_DESCRIPTION_PATTERN.search(code)
         if match:
             desc = match.group(1)
             # Clean up escaped characters
-            desc = desc.replace('\\n', '\n').replace('\\"', '"').replace("\\'", "'").replace('\\\\', '\\')
-            return desc.strip()
+            return unescape_string(desc).strip()
         return None
     
     def _extract_questions(self, code: str) -> List[Dict[str, Any]]:
@@ -95,20 +152,13 @@ class ScriptParser:
         # Pattern to match: form.add*Item() followed by method chains
         # Handle both single-line and multi-line method chains
         # Match: form.add*Item()...setTitle()...setRequired()... (up to next statement)
-        pattern = r'form\.(add\w+Item\(\)(?:\s*\.[^;]*)*)'
-        
-        matches = re.finditer(pattern, code, re.DOTALL)
-        for match in matches:
-            block = match.group(0)
+        for match in QUESTION_BLOCK_PATTERN.finditer(code):
             # Extend to include all chained methods until semicolon or new form.add
-            # Find the end of the statement
-            start_pos = match.end()
-            # Look for semicolon or next form.add
-            end_match = re.search(r'[;]|form\.add', code[start_pos:])
-            if end_match:
-                end_pos = start_pos + end_match.start()
-                block = code[match.start():end_pos]
-            blocks.append(block)
+            # Find the end of the statement with str.find, which scans in place instead of
+            # re-searching a fresh copy of the rest of the script for every question
+            end = match.end()
+            ends = [pos for pos in (code.find(';', end), code.find('form.add', end)) if pos != -1]
+            blocks.append(code[match.start():min(ends)] if ends else match.group(0))
         
         return blocks
     
@@ -122,49 +172,33 @@ class ScriptParser:
             'help_text': ''
         }
         
-        # Determine question type
-        if 'addTextItem()' in block:
-            question['type'] = 'text'
-        elif 'addMultipleChoiceItem()' in block:
-            question['type'] = 'choice'
-        elif 'addListItem()' in block:
-            question['type'] = 'dropdown'
-        elif 'addCheckboxItem()' in block:
-            question['type'] = 'checkbox'
-        elif 'addScaleItem()' in block or 'addLinearScaleItem()' in block:
-            question['type'] = 'linear_scale'
-        elif 'addPageBreakItem()' in block or 'addSectionHeaderItem()' in block:
-            # Skip page breaks and section headers - they're not questions
-            return None
-        else:
+        # Determine question type from the item the block starts with
+        item_match = ITEM_PATTERN.search(block)
+        question_type = ITEM_TYPES.get(item_match.group(1)) if item_match else None
+        if question_type is None:
             return None
+        question['type'] = question_type
         
         # Extract title - handle escaped quotes and newlines
-        title_match = re.search(r'\.setTitle\(["\'](.*?)["\']\)', block, re.DOTALL)
+        title_match = TITLE_PATTERN.search(block)
         if title_match:
-            title_text = title_match.group(1)
+            title_text = title_match.group(title_match.lastindex)
             # Unescape common escape sequences
-            title_text = title_text.replace('\\n', '\n').replace('\\"', '"').replace("\\'", "'").replace('\\\\', '\\')
-            question['text'] = title_text.strip()
+            question['text'] = unescape_string(title_text).strip()
         
         # Extract required status - default to False if not specified
-        required_match = re.search(r'\.setRequired\((true|false)\)', block)
-        if required_match:
-            question['required'] = required_match.group(1).lower() == 'true'
-        else:
-            # If not explicitly set, default to False (optional)
-            question['required'] = False
+        # If not explicitly set, default to False (optional)
+        question['required'] = self._extract_required(block)
         
         # Extract help text
-        help_match = re.search(r'\.setHelpText\(["\'](.*?)["\']\)', block, re.DOTALL)
+        help_match = HELP_TEXT_PATTERN.search(block)
         if help_match:
-            help_text = help_match.group(1)
+            help_text = help_match.group(help_match.lastindex)
             # Unescape
-            help_text = help_text.replace('\\n', '\n').replace('\\"', '"').replace("\\'", "'").replace('\\\\', '\\')
-            question['help_text'] = help_text.strip()
+            question['help_text'] = unescape_string(help_text).strip()
         
         # Extract options (for choice/dropdown/checkbox)
-        if question['type'] in ['choice', 'dropdown', 'checkbox']:
+        if question['type'] in CHOICE_TYPES:
             options = self._extract_options(block)
             question['options'] = options
         
@@ -175,26 +209,66 @@ class ScriptParser:
         
         return question
     
+    def _extract_required(self, block: str) -> bool:
+        """Return the first literal .setRequired(true|false) value, False if there is none."""
+        pos = block.find(REQUIRED_CALL)
+        while pos != -1:
+            pos += len(REQUIRED_CALL)
+            if block.startswith('true)', pos):
+                return True
+            if block.startswith('false)', pos):
+                return False
+            pos = block.find(REQUIRED_CALL, pos)
+        return False
+    
     def _extract_options(self, block: str) -> List[str]:
         """Extract options from setChoiceValues() call."""
-        options = []
-        
         # Match: .setChoiceValues(['Option 1', 'Option 2', ...])
         # Handle both single and multi-line arrays
-        match = re.search(r'\.setChoiceValues\(\s*\[(.*?)\]\s*\)', block, re.DOTALL)
-        if match:
-            options_str = match.group(1)
-            # Extract individual string values - handle escaped quotes
-            # Match strings that may contain escaped quotes - use proper escaping
-            option_pattern = r'["\'](?:(?:\\.)|[^"\'])*?["\']'
-            option_matches = re.findall(option_pattern, options_str)
-            for opt in option_matches:
-                # Remove quotes and unescape
-                opt = opt.strip("'\"")
-                opt = opt.replace("\\'", "'").replace('\\"', '"').replace('\\n', '\n')
-                options.append(opt)
-        
-        return options
+        start = self._find_choice_array(block)
+        if start == -1:
+            return []
+        
+        # Scan the array literal once, tracking whether we are inside a string
+        # (and which quote opened it) so commas, brackets and the other quote
+        # character inside an option are kept as text
+        options = []
+        quote = None
+        escaped = False
+        value_start = 0
+        for pos in range(start, len(block)):
+            char = block[pos]
+            if quote:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == quote:
+                    # Intern so repeated options ("Yes"/"No", shared scales) across
+                    # questions share one string object
+                    options.append(sys.intern(unescape_string(block[value_start:pos])))
+                    quote = None
+            elif char == '"' or char == "'":
+                quote = char
+                value_start = pos + 1
+            elif char == ']':
+                return options
+        
+        # Unterminated array
+        return []
+    
+    @staticmethod
+    def _find_choice_array(block: str) -> int:
+        """Return the position just inside the first setChoiceValues([ ... array, or -1."""
+        pos = block.find(CHOICE_VALUES_CALL)
+        while pos != -1:
+            pos += len(CHOICE_VALUES_CALL)
+            while pos < len(block) and block[pos].isspace():
+                pos += 1
+            if block.startswith('[', pos):
+                return pos + 1
+            pos = block.find(CHOICE_VALUES_CALL, pos)
+        return -1
     
     def _extract_scale_params(self, block: str) -> Dict[str, Any]:
         """Extract linear scale parameters."""
@@ -205,14 +279,23 @@ class ScriptParser:
             'max_label': ''
         }
         
-        # Extract min value
-        min_match = re.search(r'\.setBounds\((\d+),\s*(\d+)\)', block)
-        if min_match:
-            params['min'] = int(min_match.group(1))
-            params['max'] = int(min_match.group(2))
+        # Extract min and max values from the first .setBounds(min, max) with literal numbers
+        pos = block.find(BOUNDS_CALL)
+        while pos != -1:
+            pos += len(BOUNDS_CALL)
+            close = block.find(')', pos)
+            if close == -1:
+                break
+            low, comma, high = block[pos:close].partition(',')
+            high = high.lstrip()
+            if comma and low.isdecimal() and high.isdecimal():
+                params['min'] = int(low)
+                params['max'] = int(high)
+                break
+            pos = block.find(BOUNDS_CALL, pos)
         
         # Extract labels (if any)
-        min_label_match = re.search(r'\.setLabels\(["\'](.*?)["\']\s*,\s*["\'](.*?)["\']\)', block)
+        min_label_match = LABELS_PATTERN.search(block)
         if min_label_match:
             params['min_label'] = min_label_match.group(1)
             params['max_label'] = min_label_match.group(2)
@@ -224,22 +307,36 @@ def parse_script(script_code: str) -> Dict[str, Any]:
     """
     Parse script code (Google Apps Script or JSON) and return form structure.
     
+    Results for repeated scripts (retries, re-submits) come from a small in-memory cache.
+    
     Args:
         script_code: Script code as string (JavaScript or JSON)
     
     Returns:
         Dictionary containing form structure
     """
-    # Try to parse as JSON first
-    try:
-        import json
-        data = json.loads(script_code)
-        if isinstance(data, dict) and 'questions' in data:
-            return data
-    except:
-        pass
+    if len(script_code) > PARSE_CACHE_MAX_CHARS:
+        return _parse_script_uncached(script_code)
+    # Hand out a copy so callers can modify the result without touching the cached one
+    return copy.deepcopy(_parse_script_cached(script_code))
+
+
+def _parse_script_uncached(script_code: str) -> Dict[str, Any]:
+    """Parse script code without consulting the cache."""
+    # Try to parse as JSON first - only a JSON object can hold a form, so skip the
+    # full (and failing) JSON parse for anything else, such as Apps Script code
+    if script_code.lstrip().startswith('{'):
+        try:
+            data = json.loads(script_code)
+            if isinstance(data, dict) and 'questions' in data:
+                return data
+        except ValueError:
+            pass
     
     # If not JSON, try to parse as Google Apps Script
-    parser = ScriptParser()
-    return parser.parse_script(script_code)
+    return _PARSER.parse_script(script_code)
+
 
+# Shared parser instance (ScriptParser is stateless)
+_PARSER = ScriptParser()
+_parse_script_cached = functools.lru_cache(maxsize=128)(_parse_script_uncached)
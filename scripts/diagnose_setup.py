@@ -8,6 +8,13 @@ import json
 import sys
 from pathlib import Path
 
+# Add parent directory to path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from config_helper import ConfigHelper
+
 
 def print_header(title):
     """Print a formatted header."""
@@ -34,8 +41,8 @@ def check_credentials_file():
     print(f"✅ {creds_file} found")
     
     try:
-        with open(creds_file, 'r') as f:
-            data = json.load(f)
+        # Shares ConfigHelper's parsed-file cache so validation doesn't parse the file again
+        data = ConfigHelper.load_credentials_file(creds_file)
         
         # Check structure
         oauth_data = data.get('installed') or data.get('web')
@@ -73,10 +80,14 @@ def check_credentials_file():
 
 
 def check_token_file():
-    """Check if token.pickle exists."""
+    """Check if token.json (or a legacy token.pickle) exists."""
     print_header("Checking Token File")
     
-    token_file = 'token.pickle'
+    token_file = 'token.json'
+    
+    if os.path.exists('token.pickle') and not os.path.exists(token_file):
+        print("ℹ️  token.pickle found (will be converted to token.json on next start)")
+        return True
     
     if os.path.exists(token_file):
         print(f"✅ {token_file} exists (authentication completed before)")
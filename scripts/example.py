@@ -79,7 +79,7 @@ def example_basic_form():
         question_type="paragraph"
     )
     
-    form_url = form.get_url()
+    form_url = generator.save_form(form)
     print(f"\n✅ Basic form created successfully!")
     print(f"View form: {form_url}")
     print(f"Edit form: {form.get_edit_url()}\n")
@@ -139,7 +139,7 @@ def example_event_registration_form():
         question_type="paragraph"
     )
     
-    form_url = form.get_url()
+    form_url = generator.save_form(form)
     print(f"\n✅ Event registration form created successfully!")
     print(f"View form: {form_url}")
     print(f"Edit form: {form.get_edit_url()}\n")
@@ -198,7 +198,7 @@ def example_feedback_form():
         options=["Feature Request", "Bug Report", "Usability", "Performance", "Other"]
     )
     
-    form_url = form.get_url()
+    form_url = generator.save_form(form)
     print(f"\n✅ Product feedback form created successfully!")
     print(f"View form: {form_url}")
     print(f"Edit form: {form.get_edit_url()}\n")
@@ -5,14 +5,20 @@ Helper script to install optional dependencies for file reading
 import subprocess
 import sys
 
-def install_package(package):
-    """Install a Python package using pip."""
+def install_packages(*packages):
+    """Install Python packages using a single pip run (one dependency resolution and download pass)."""
+    names = ', '.join(packages)
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-        print(f"✅ Successfully installed {package}")
+        subprocess.check_call([
+            sys.executable, "-m", "pip", "install",
+            "--disable-pip-version-check", "--no-input",
+            "--prefer-binary",  # wheels over source builds (pandas takes minutes to compile)
+            *packages
+        ])
+        print(f"✅ Successfully installed {names}")
         return True
     except subprocess.CalledProcessError:
-        print(f"❌ Failed to install {package}")
+        print(f"❌ Failed to install {names}")
         return False
 
 def main():
@@ -43,18 +49,16 @@ def main():
     
     if choice == '1':
         print("\nInstalling all dependencies...")
-        for package in dependencies.keys():
-            install_package(package)
+        install_packages(*dependencies.keys())
     
     elif choice == '2':
-        install_package('python-docx')
+        install_packages('python-docx')
     
     elif choice == '3':
-        install_package('PyPDF2')
+        install_packages('PyPDF2')
     
     elif choice == '4':
-        install_package('pandas')
-        install_package('openpyxl')
+        install_packages('pandas', 'openpyxl')
     
     elif choice == '5':
         print("\n👋 Exiting...")
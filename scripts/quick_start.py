@@ -13,6 +13,33 @@ if parent_dir not in sys.path:
 from google_form_generator import GoogleFormGenerator
 from config_helper import ConfigHelper
 
+# Print full tracebacks for unexpected errors (same switch as the web app)
+DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
+
+ACCESS_DENIED_HELP = (
+    "\n" + "=" * 70 + "\n"
+    "❌ 403: access_denied Error Detected\n"
+    + "=" * 70 + "\n"
+    "\nYour app is in testing mode. You need to add your email\n"
+    "to the Test users list in Google Cloud Console.\n"
+    "\n📖 See FIX_403_ERROR.md for step-by-step instructions\n"
+    "\nQuick fix:\n"
+    "1. Go to: https://console.cloud.google.com/\n"
+    "2. APIs & Services > OAuth consent screen\n"
+    "3. Scroll to 'Test users' > Click 'ADD USERS'\n"
+    "4. Add your Google email > Click 'SAVE'\n"
+    "5. Run this script again\n"
+    + "=" * 70
+)
+
+GENERIC_ERROR_HELP = (
+    "\nPlease check:\n"
+    "1. Google Forms API is enabled in Google Cloud Console\n"
+    "2. OAuth consent screen is configured\n"
+    "3. credentials.json is valid\n"
+    "4. Run: python diagnose_setup.py"
+)
+
 
 def quick_start():
     """Quick start example - creates a simple test form."""
@@ -58,8 +85,8 @@ def quick_start():
             options=["Python", "JavaScript", "Java", "C++", "Other"]
         )
         
-        # Get URLs
-        view_url = form.get_url()
+        # Send the queued questions and get URLs
+        view_url = generator.save_form(form)
         edit_url = form.get_edit_url()
         
         print("\n" + "=" * 70)
@@ -86,28 +113,15 @@ def quick_start():
     except Exception as e:
         error_str = str(e).lower()
         if 'access_denied' in error_str or '403' in error_str:
-            print("\n" + "="*70)
-            print("❌ 403: access_denied Error Detected")
-            print("="*70)
-            print("\nYour app is in testing mode. You need to add your email")
-            print("to the Test users list in Google Cloud Console.")
-            print("\n📖 See FIX_403_ERROR.md for step-by-step instructions")
-            print("\nQuick fix:")
-            print("1. Go to: https://console.cloud.google.com/")
-            print("2. APIs & Services > OAuth consent screen")
-            print("3. Scroll to 'Test users' > Click 'ADD USERS'")
-            print("4. Add your Google email > Click 'SAVE'")
-            print("5. Run this script again")
-            print("="*70)
+            print(ACCESS_DENIED_HELP)
         else:
             print(f"\n❌ An error occurred: {e}")
-            import traceback
-            traceback.print_exc()
-            print("\nPlease check:")
-            print("1. Google Forms API is enabled in Google Cloud Console")
-            print("2. OAuth consent screen is configured")
-            print("3. credentials.json is valid")
-            print("4. Run: python diagnose_setup.py")
+            if DEBUG:
+                import traceback
+                traceback.print_exc()
+            else:
+                print("   (set DEBUG=true for the full traceback)")
+            print(GENERIC_ERROR_HELP)
 
 
 if __name__ == '__main__':
@@ -5,8 +5,18 @@ Cross-platform launcher for Windows and macOS
 
 import os
 import sys
+import time
+import socket
 import webbrowser
-from threading import Timer
+import importlib.util
+from threading import Thread
+
+HOST = '127.0.0.1'
+PORT = 5000
+# How long to wait for the server to start listening before giving up on the browser
+BROWSER_WAIT_SECONDS = 30
+# Worker threads for waitress, so concurrent requests overlap their Gemini/Google API calls
+SERVER_THREADS = 8
 
 # Load environment variables from .env file if it exists
 try:
@@ -18,19 +28,18 @@ except ImportError:
 
 def check_dependencies():
     """Check if required dependencies are installed."""
-    try:
-        import flask
+    # find_spec only locates Flask; the real (slow) import happens once, with the app
+    if importlib.util.find_spec('flask') is not None:
         return True
-    except ImportError:
-        print("\n" + "="*70)
-        print("❌ Missing dependency: Flask")
-        print("="*70)
-        print("Please install Flask:")
-        print("  pip install flask")
-        print("\nOr install all dependencies:")
-        print("  pip install -r requirements.txt")
-        print("="*70 + "\n")
-        return False
+    print("\n" + "="*70)
+    print("❌ Missing dependency: Flask")
+    print("="*70)
+    print("Please install Flask:")
+    print("  pip install flask")
+    print("\nOr install all dependencies:")
+    print("  pip install -r requirements.txt")
+    print("="*70 + "\n")
+    return False
 
 def main():
     """Main launcher function."""
@@ -44,8 +53,6 @@ def main():
         sys.exit(1)
     
     # Add parent directory to path to import app
-    import sys
-    import os
     parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     if parent_dir not in sys.path:
         sys.path.insert(0, parent_dir)
@@ -55,23 +62,39 @@ def main():
     
     print("\n📝 Starting web server...")
     print("💡 The application will open in your browser automatically")
-    print("💡 Server URL: http://127.0.0.1:5000")
+    print(f"💡 Server URL: http://{HOST}:{PORT}")
     print("💡 Press Ctrl+C to stop the server\n")
     print("="*70 + "\n")
     
-    # Open browser after a short delay
+    # Open browser once the server is accepting connections
     def open_browser():
+        deadline = time.monotonic() + BROWSER_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection((HOST, PORT), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            return
         try:
-            webbrowser.open('http://127.0.0.1:5000')
+            webbrowser.open(f'http://{HOST}:{PORT}')
         except:
             print("⚠️  Could not open browser automatically.")
-            print("   Please open http://127.0.0.1:5000 in your browser manually.")
+            print(f"   Please open http://{HOST}:{PORT} in your browser manually.")
     
-    Timer(1.5, open_browser).start()
+    Thread(target=open_browser, daemon=True).start()
     
-    # Run Flask app
+    # Run Flask app - under waitress if installed, otherwise the Flask development server
     try:
-        app.run(host='127.0.0.1', port=5000, debug=False, use_reloader=False)
+        try:
+            from waitress import serve
+        except ImportError:
+            print("⚠️  waitress not installed, using the Flask development server")
+            print("   For a production-grade server: pip install waitress\n")
+            app.run(host=HOST, port=PORT, debug=False, use_reloader=False)
+        else:
+            serve(app, host=HOST, port=PORT, threads=SERVER_THREADS)
     except KeyboardInterrupt:
         print("\n\n👋 Server stopped. Goodbye!")
     except Exception as e:
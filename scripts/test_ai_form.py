@@ -4,6 +4,7 @@ Quick test script for AI form creation
 
 import sys
 import os
+import functools
 
 # Add parent directory to path
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -16,11 +17,16 @@ from ai_form_creator import AIFormCreator
 # Get your API key from: https://aistudio.google.com/app/apikey
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY") or "YOUR_API_KEY_HERE"
 
+@functools.lru_cache(maxsize=1)
+def _get_creator() -> AIFormCreator:
+    """Build the AIFormCreator on first use and share it between tests."""
+    return AIFormCreator(GEMINI_API_KEY)
+
 def test_text_input():
     """Test form creation from text."""
     print("Testing text input...")
     
-    creator = AIFormCreator(GEMINI_API_KEY)
+    creator = _get_creator()
     
     text = """
     Create a simple customer feedback form with:
@@ -42,7 +48,7 @@ def test_file_input():
     """Test form creation from file."""
     print("Testing file input...")
     
-    creator = AIFormCreator(GEMINI_API_KEY)
+    creator = _get_creator()
     
     try:
         form_url = creator.create_form_from_file("example_input.txt")
@@ -53,9 +59,13 @@ def test_file_input():
         traceback.print_exc()
 
 if __name__ == '__main__':
-    import sys
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'text'
     
-    if len(sys.argv) > 1 and sys.argv[1] == 'file':
+    if mode == 'file':
+        test_file_input()
+    elif mode == 'all':
+        # Both tests share one creator via _get_creator()
+        test_text_input()
         test_file_input()
     else:
         test_text_input()
@@ -0,0 +1,163 @@
+"""
+Semantic response cache for AI form generation
+Returns a cached form structure when a new request is a close paraphrase of an earlier one
+"""
+
+import os
+import time
+import zlib
+import sqlite3
+import tempfile
+import threading
+from typing import Optional
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    # sentence-transformers not installed, semantic cache unavailable
+    SentenceTransformer = None
+
+try:
+    import faiss
+except ImportError:
+    # faiss not installed, fall back to a numpy dot product over all embeddings
+    faiss = None
+
+
+class SemanticCache:
+    """Embedding-similarity cache for generated form structures."""
+
+    def __init__(self, namespace: str = '', db_path: str = None, threshold: float = 0.90, top_k: int = 5,
+                 model_name: str = 'all-MiniLM-L6-v2', ttl_days: float = 7):
+        """
+        Load the embedding model and any previously cached embeddings.
+
+        Args:
+            namespace: Entries are only matched within one namespace (e.g. a hash of Gemini model + system prompt)
+            db_path: Path to SQLite file (optional, defaults to GEMINI_CACHE_PATH or the system temp dir)
+            threshold: Minimum cosine similarity for a hit (0-1)
+            top_k: Number of nearest neighbours to consider per lookup
+            model_name: sentence-transformers model used for embeddings
+            ttl_days: Days before an entry expires, as in ResponseCache (None or 0 keeps entries forever)
+        """
+        if SentenceTransformer is None:
+            raise ImportError(
+                "sentence-transformers required for the semantic cache.\n"
+                "Install with: pip install sentence-transformers"
+            )
+
+        if db_path is None:
+            db_path = os.getenv('GEMINI_CACHE_PATH') or os.path.join(
+                tempfile.gettempdir(), 'gemini_form_cache.sqlite3'
+            )
+
+        self.db_path = db_path
+        self.namespace = namespace
+        self.threshold = threshold
+        self.top_k = top_k
+        self.ttl_seconds = ttl_days * 86400 if ttl_days else None
+        self._model = SentenceTransformer(model_name)
+        dim = self._model.get_sentence_embedding_dimension()
+
+        # Row ids in the same order as the vectors in the index
+        self._ids = []
+        self._index = faiss.IndexFlatIP(dim) if faiss is not None else None
+        self._vectors = np.zeros((0, dim), dtype='float32')
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS semantic_responses ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, namespace TEXT NOT NULL, '
+                'embedding BLOB NOT NULL, value BLOB NOT NULL, created_at INTEGER NOT NULL)'
+            )
+            # Expired entries are dropped rather than loaded into the index
+            self._conn.execute(
+                'DELETE FROM semantic_responses WHERE created_at <= ?', (self._expiry_cutoff(),)
+            )
+            rows = self._conn.execute(
+                'SELECT id, embedding FROM semantic_responses WHERE namespace = ? ORDER BY id', (namespace,)
+            ).fetchall()
+
+        if rows:
+            self._add_vectors(
+                [row_id for row_id, _ in rows],
+                np.vstack([np.frombuffer(blob, dtype='float32') for _, blob in rows])
+            )
+
+    def _expiry_cutoff(self) -> float:
+        """Entries created at or before this time have expired (never, without a TTL)."""
+        return time.time() - self.ttl_seconds if self.ttl_seconds else float('-inf')
+
+    def _embed(self, text: str):
+        """Embed text as a (1, dim) L2-normalized float32 array (inner product = cosine similarity)."""
+        return self._model.encode([text], normalize_embeddings=True).astype('float32')
+
+    def _add_vectors(self, ids: list, vectors):
+        """Append embeddings to the in-memory index (caller holds the lock or is __init__)."""
+        self._ids.extend(ids)
+        if self._index is not None:
+            self._index.add(vectors)
+        else:
+            self._vectors = np.vstack([self._vectors, vectors])
+
+    def get(self, text: str) -> Optional[str]:
+        """
+        Look up the cached value of the most similar earlier request.
+
+        Args:
+            text: Normalized request text
+
+        Returns:
+            Cached string, or None if nothing is similar enough
+        """
+        vector = self._embed(text)
+
+        with self._lock:
+            if not self._ids:
+                return None
+
+            k = min(self.top_k, len(self._ids))
+            if self._index is not None:
+                scores, positions = self._index.search(vector, k)
+                scores, positions = scores[0], positions[0]
+            else:
+                all_scores = self._vectors @ vector[0]
+                positions = np.argsort(-all_scores)[:k]
+                scores = all_scores[positions]
+
+            # Neighbours come back best-first; take the first one above the threshold that
+            # still has an unexpired row (stale vectors stay in the index but never match)
+            cutoff = self._expiry_cutoff()
+            for score, position in zip(scores, positions):
+                if score < self.threshold:
+                    break
+                row_id = self._ids[position]
+                row = self._conn.execute(
+                    'SELECT value FROM semantic_responses WHERE id = ? AND created_at > ?', (row_id, cutoff)
+                ).fetchone()
+                if row is not None:
+                    return zlib.decompress(row[0]).decode('utf-8')
+                with self._conn:
+                    self._conn.execute('DELETE FROM semantic_responses WHERE id = ?', (row_id,))
+
+        return None
+
+    def set(self, text: str, value: str):
+        """
+        Store a value under the embedding of the given request text.
+
+        Args:
+            text: Normalized request text
+            value: String to cache
+        """
+        vector = self._embed(text)
+        blob = zlib.compress(value.encode('utf-8'))
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'INSERT INTO semantic_responses (namespace, embedding, value, created_at) VALUES (?, ?, ?, ?)',
+                (self.namespace, vector[0].tobytes(), blob, int(time.time()))
+            )
+            self._add_vectors([cursor.lastrowid], vector)